@@ -1,11 +1,24 @@
+import utils.startup  # imported first: starts the startup clock
 import sys
 from PyQt5.QtWidgets import QApplication
 from ui.main_window import MainWindow
 from controllers.main_controller import MainController
+from utils.profiling import profiler_from_args
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    argv = list(sys.argv)
+    # --profile [PATH] or UOXP_PROFILE; None (and nothing wrapped) otherwise
+    profiler = profiler_from_args(argv)
+    if profiler is not None:
+        profiler.install()
+
+    app = QApplication(argv)
+    window = MainWindow(fast_start=True)
     controller = MainController(window)
+    # Flush write-behind saves before the interpreter goes away
+    app.aboutToQuit.connect(controller.shutdown)
+    if profiler is not None:
+        window.first_painted.connect(profiler.set_first_paint)
+        app.aboutToQuit.connect(profiler.write_report)
     window.show()
     sys.exit(app.exec_()),''
\ No newline at end of file
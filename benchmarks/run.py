@@ -0,0 +1,331 @@
+"""
+Headless benchmarks for storage, table refresh and graph rendering.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1k,100k --only load,append --save base.json
+    python -m benchmarks.run --sizes 100k --compare base.json
+
+`-m` needs the repo root as the current directory; `python
+path/to/benchmarks/run.py` works from anywhere.
+
+Every benchmark runs `--repeat` timed rounds after one warm-up round, then
+one extra round under tracemalloc for the peak Python heap. --compare exits
+with status 1 when a median got slower than the baseline by more than
+--threshold (a ratio).
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Must be set before anything imports PyQt5
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# `python benchmarks/run.py` only puts benchmarks/ itself on the path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import ASPECTS, parse_size, write_journal
+
+BATCH = 100  # records per append/delete round
+
+
+@dataclass
+class Result:
+    name: str
+    size: int
+    times: List[float] = field(default_factory=list)  # seconds
+    peak_bytes: int = 0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    def key(self) -> str:
+        return f"{self.size}/{self.name}"
+
+
+def measure(name: str, size: int, op: Callable[[Any], None], setup: Optional[Callable[[], Any]] = None,
+            teardown: Optional[Callable[[Any], None]] = None, repeat: int = 5, warmup: int = 1) -> Result:
+    """
+    Time op(setup()) `repeat` times, then take its tracemalloc peak once.
+    setup/teardown are not timed.
+    """
+    result = Result(name, size)
+
+    for i in range(warmup + repeat + 1):
+        state = setup() if setup else None
+        traced = i == warmup + repeat
+        if traced:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        op(state)
+        elapsed = time.perf_counter() - start
+
+        if traced:
+            result.peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        elif i >= warmup:
+            result.times.append(elapsed)
+
+        if teardown:
+            teardown(state)
+
+    return result
+
+
+# -------------------------
+# Storage benchmarks
+# -------------------------
+
+class StorageBench:
+    """
+    StorageService over a fresh copy of the generated journal for every round.
+    """
+    def __init__(self, workdir: Path, journal: Path):
+        self.dir = workdir / "storage"
+        self.journal = journal
+        self.last_timestamp = _last_record(journal)["timestamp"]
+        self.timestamps = _sample_timestamps(journal, BATCH)
+
+    def open(self, load=True, **config):
+        from services.storage_service import StorageConfig, open_storage
+
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.dir.mkdir(parents=True)
+        shutil.copyfile(self.journal, self.dir / "history.jsonl")
+        storage = open_storage(StorageConfig(data_dir=self.dir, backend="jsonl", **config))
+        if load:
+            storage.load_frame()
+        return storage
+
+    def new_records(self):
+        from datetime import datetime, timedelta
+
+        last = datetime.fromisoformat(self.last_timestamp)
+        return [
+            {
+                "timestamp": (last + timedelta(seconds=i + 1)).isoformat(timespec="seconds"),
+                "aspect": ASPECTS[i % len(ASPECTS)],
+                "aspect_level": i % 15,
+                "aspect_xp": 1000 + i,
+                "chain_level": i % 30,
+                "chain_xp": 100_000 + i,
+            }
+            for i in range(BATCH)
+        ]
+
+    def run(self, size, only, repeat):
+        results = []
+
+        if "load" in only:
+            def load(storage):
+                storage.load_frame()
+                storage.history_index()
+            results.append(measure(
+                "load", size, load, lambda: self.open(load=False), repeat=repeat,
+            ))
+
+        if "append" in only:
+            def append(state):
+                storage, records = state
+                for record in records:
+                    storage.append_record(record)
+            results.append(measure(
+                "append", size, append,
+                lambda: (self.open(), self.new_records()), repeat=repeat,
+            ))
+            results.append(measure(
+                "append_write_behind", size, append,
+                lambda: (self.open(write_behind=True), self.new_records()),
+                teardown=lambda state: state[0].close(), repeat=repeat,
+            ))
+
+        if "delete" in only:
+            def delete(storage):
+                for timestamp in self.timestamps:
+                    storage.delete_record(timestamp)
+                storage.load_frame()  # applies the pending deletes
+            results.append(measure(
+                "delete", size, delete, self.open, repeat=repeat,
+            ))
+
+        return results
+
+
+# -------------------------
+# UI benchmarks (controller + widgets, offscreen)
+# -------------------------
+
+class AppBench:
+    """
+    MainWindow + MainController running in `workdir` (the controller reads
+    ./data), with the newest record's aspect/level/chain level selected.
+    """
+    def __init__(self, app, workdir: Path, journal: Path):
+        from controllers.main_controller import MainController
+        from ui.main_window import MainWindow
+
+        self.app = app
+        data = workdir / "app" / "data"
+        data.mkdir(parents=True)
+        shutil.copyfile(journal, data / "history.jsonl")
+
+        self._cwd = os.getcwd()
+        os.chdir(data.parent)
+
+        self.window = MainWindow(fast_start=False)
+        self.window.resize(1200, 900)
+        self.controller = MainController(self.window)
+        self.window.show()
+        self.wait(self.history_filled)
+
+        last = _last_record(journal)
+        self.window.aspect_combo.setCurrentIndex(ASPECTS.index(last["aspect"]) + 1)
+        self.window.aspect_level_combo.setCurrentIndex(last["aspect_level"])
+        self.window.chain_combo.setCurrentIndex(last["chain_level"] + 1)
+        self.wait(self.graphs_idle)
+
+    def close(self):
+        self.controller.shutdown()
+        self.window.close()
+        self.window.deleteLater()
+        self.app.processEvents()
+        os.chdir(self._cwd)
+
+    def wait(self, done, timeout=600):
+        deadline = time.perf_counter() + timeout
+        self.app.processEvents()
+        while not done():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("benchmark did not settle")
+            self.app.processEvents()
+            time.sleep(0.0005)
+
+    def history_filled(self):
+        c = self.controller
+        return c.history_ready and not c.window.history_model.hidden_count() and not c.scheduler.is_pending()
+
+    def graphs_idle(self):
+        return not self.controller.workers.is_busy("graphs") and not self.controller.scheduler.is_pending()
+
+    def run(self, size, only, repeat):
+        results = []
+
+        if "table" in only:
+            def table_refresh(_):
+                self.controller.refresh_history()
+                self.wait(self.history_filled)
+            results.append(measure("table_refresh", size, table_refresh, repeat=repeat))
+
+        if "progress" in only:
+            results.append(measure(
+                "progress_refresh", size, lambda _: self.controller.refresh_progress_bars(), repeat=repeat,
+            ))
+
+        if "graph" in only:
+            def graph_render(_):
+                self.controller.refresh_graphs()
+                self.wait(self.graphs_idle)
+                # Full (non-idle) draws so the render is part of the timing
+                self.window.aspect_xp_graph.draw()
+                self.window.aspect_level_graph.draw()
+            results.append(measure("graph_render", size, graph_render, repeat=repeat))
+
+        return results
+
+
+# -------------------------
+# Helpers
+# -------------------------
+
+def _last_record(journal: Path) -> Dict[str, Any]:
+    with open(journal, "rb") as f:
+        f.seek(max(0, journal.stat().st_size - 4096))
+        return json.loads(f.read().splitlines()[-1])
+
+
+def _sample_timestamps(journal: Path, count: int) -> List[str]:
+    # Evenly spaced through the file, so deletes hit old and new records
+    with open(journal, "r", encoding="utf-8") as f:
+        stamps = [json.loads(line)["timestamp"] for line in f]
+    step = max(1, len(stamps) // count)
+    return stamps[::step][:count]
+
+
+def _report(results: List[Result], baseline: Optional[Dict[str, Any]], threshold: float) -> int:
+    regressions = 0
+    print(f"{'size':>9}  {'benchmark':<22}{'min ms':>11}{'median ms':>11}{'peak MiB':>10}")
+    for r in results:
+        line = (f"{r.size:>9,}  {r.name:<22}{r.best * 1000:>11.2f}{r.median * 1000:>11.2f}"
+                f"{r.peak_bytes / 2**20:>10.1f}")
+        base = (baseline or {}).get(r.key())
+        if base:
+            ratio = r.median / base["median"] if base["median"] else 1.0
+            line += f"   x{ratio:.2f} vs baseline"
+            if ratio > threshold:
+                line += "  REGRESSION"
+                regressions += 1
+        print(line)
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1k,100k,1m", help="comma-separated record counts (1k, 100k, 1m, ...)")
+    parser.add_argument("--only", default="load,append,delete,table,progress,graph",
+                        help="subset of: load, append, delete, table, progress, graph")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", type=Path, help="write results as JSON (usable as a --compare baseline)")
+    parser.add_argument("--compare", type=Path, help="baseline JSON from an earlier --save")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="median/baseline ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    only = {name.strip() for name in args.only.split(",")}
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+
+    results: List[Result] = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix="uoxp-bench-") as tmp:
+            workdir = Path(tmp)
+            journal = write_journal(workdir / "history.jsonl", size, args.seed)
+
+            results += StorageBench(workdir, journal).run(size, only, args.repeat)
+
+            if only & {"table", "progress", "graph"}:
+                bench = AppBench(app, workdir, journal)
+                try:
+                    results += bench.run(size, only, args.repeat)
+                finally:
+                    bench.close()
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    regressions = _report(results, baseline, args.threshold)
+
+    if args.save:
+        args.save.write_text(json.dumps({
+            r.key(): {"median": r.median, "min": r.best, "peak_bytes": r.peak_bytes, "runs": r.times}
+            for r in results
+        }, indent=2))
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
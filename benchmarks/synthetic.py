@@ -0,0 +1,114 @@
+"""
+Deterministic synthetic XP history for benchmarks.
+
+Records look like the ones the app saves: second-resolution ISO timestamps
+in play sessions (bursts a few minutes apart, sessions hours apart), every
+aspect and chain level represented, and XP climbing through each level
+before rolling over to the next one. The same (n, seed) always produces the
+same history.
+"""
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from models.rules import ASPECT_XP_BY_LEVEL, ASPECTS, CHAIN_XP_BY_LEVEL, validate_record
+
+START = datetime(2024, 1, 1, 18, 0, 0)
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def iter_history(n: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Yield `n` records, oldest first.
+    """
+    rng = random.Random(seed)
+
+    # A few "main" aspects get most of the play time
+    weights = [1 / (rank + 1) for rank in range(len(ASPECTS))]
+    rng.shuffle(weights)
+    share = {a: w / sum(weights) for a, w in zip(ASPECTS, weights)}
+
+    # Size the XP gains so each aspect, and the chain, works its way through
+    # all levels over the whole history regardless of n
+    aspect_total = sum(ASPECT_XP_BY_LEVEL.values())
+    chain_total = sum(CHAIN_XP_BY_LEVEL.values())
+    aspect_gain = {a: aspect_total / max(1.0, n * share[a]) for a in ASPECTS}
+    chain_gain = chain_total / n
+
+    aspect_state = {a: [0, 0] for a in ASPECTS}  # aspect -> [level, xp]
+    chain_level, chain_xp = 0, 0
+    now = START
+
+    for _ in range(n):
+        # Mostly back-to-back entries within a session, sometimes a new session
+        if rng.random() < 0.02:
+            now += timedelta(hours=rng.uniform(6, 30))
+        else:
+            now += timedelta(seconds=rng.randint(30, 600))
+
+        aspect = rng.choices(ASPECTS, weights)[0]
+        state = aspect_state[aspect]
+        state[1] += int(aspect_gain[aspect] * rng.uniform(0.5, 1.5))
+        # One big gain (small n) can be worth several levels
+        while state[1] >= ASPECT_XP_BY_LEVEL[state[0]]:
+            level_max = ASPECT_XP_BY_LEVEL[state[0]]
+            if state[0] < max(ASPECT_XP_BY_LEVEL):
+                state[0] += 1
+                state[1] -= level_max
+            else:
+                state[1] = level_max
+                break
+
+        chain_xp += int(chain_gain * rng.uniform(0.5, 1.5))
+        while chain_xp >= CHAIN_XP_BY_LEVEL[chain_level]:
+            chain_max = CHAIN_XP_BY_LEVEL[chain_level]
+            if chain_level < max(CHAIN_XP_BY_LEVEL):
+                chain_level += 1
+                chain_xp -= chain_max
+            else:
+                chain_xp = chain_max
+                break
+
+        record = {
+            "timestamp": now.isoformat(timespec="seconds"),
+            "aspect": aspect,
+            "aspect_level": state[0],
+            "aspect_xp": state[1],
+            "chain_level": chain_level,
+            "chain_xp": chain_xp,
+        }
+        # Also used as bulk import input, so it must pass the importer as is
+        assert validate_record(record) == record, record
+        yield record
+
+
+def generate_history(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    return list(iter_history(n, seed))
+
+
+def write_journal(path: Path, n: int, seed: int = 0) -> Path:
+    """
+    Stream `n` records into a history.jsonl journal at `path`.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for record in iter_history(n, seed):
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+    return path
+
+
+def parse_size(text: str) -> int:
+    """
+    "1k" / "100k" / "1m" / plain integers.
+    """
+    text = text.strip().lower()
+    if text in SIZES:
+        return SIZES[text]
+    if text.endswith("k"):
+        return int(float(text[:-1]) * 1_000)
+    if text.endswith("m"):
+        return int(float(text[:-1]) * 1_000_000)
+    return int(text)
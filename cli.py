@@ -0,0 +1,127 @@
+"""
+Headless entry point.
+
+    python cli.py import backlog.csv
+    python cli.py import old_dump.json --batch-size 20000
+    python cli.py export command_14.csv --aspect Command --aspect-level 14
+    python cli.py export - --chain-level 23 --start 2025-01-01 --fields timestamp,chain_xp
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from models.rules import FIELDS
+from services import exporter, importer
+from services.profiles import DEFAULT_PROFILE, ProfileManager
+from services.storage_service import StorageConfig
+
+
+def _storage(args):
+    profiles = ProfileManager(StorageConfig(data_dir=args.data_dir, backend=args.backend))
+    return profiles.get(profiles.create(args.profile))
+
+
+class _Progress:
+    """
+    One self-overwriting status line on stderr, at most every `interval` s.
+    """
+    def __init__(self, interval=0.5):
+        self._interval = interval
+        self._started = time.perf_counter()
+        self._last = 0.0
+
+    def __call__(self, result, final=False):
+        now = time.perf_counter()
+        if not final and now - self._last < self._interval:
+            return
+        self._last = now
+        rate = result.rows / max(now - self._started, 1e-9)
+        print(
+            f"\r  {result.rows:,} rows read ({result.fraction:.0%}), {result.imported:,} imported, "
+            f"{result.rejected:,} rejected, {rate:,.0f} rows/s",
+            end="\n" if final else "", file=sys.stderr, flush=True,
+        )
+
+
+def cmd_import(args) -> int:
+    storage = _storage(args)
+    progress = _Progress()
+    try:
+        result = importer.import_file(storage, args.file, args.format, args.batch_size, progress)
+    except (OSError, ValueError) as e:
+        print(f"\nimport failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+
+    progress(result, final=True)
+    for row, reason in result.errors:
+        print(f"  row {row}: {reason}", file=sys.stderr)
+    if result.rejected > len(result.errors):
+        print(f"  ... and {result.rejected - len(result.errors):,} more", file=sys.stderr)
+    return 0
+
+
+def cmd_export(args) -> int:
+    fields = [name.strip() for name in args.fields.split(",")] if args.fields else FIELDS
+    unknown = set(fields) - set(FIELDS)
+    if unknown:
+        print(f"unknown field(s): {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+
+    filters = dict(
+        aspect=args.aspect, aspect_level=args.aspect_level, chain_level=args.chain_level,
+        start=args.start, end=args.end,
+    )
+    to_stdout = str(args.out) == "-"
+    progress = None if to_stdout else (
+        lambda n: print(f"\r  {n:,} records written", end="", file=sys.stderr, flush=True)
+    )
+
+    storage = _storage(args)
+    try:
+        out = sys.stdout if to_stdout else args.out
+        count = exporter.export_records(storage, out, args.format, fields, progress, **filters)
+    except (OSError, ValueError) as e:
+        print(f"\nexport failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+
+    if not to_stdout:
+        print(f"\r  {count:,} records written to {args.out}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="cli.py", description="XP Tracker command line tools")
+    parser.add_argument("--data-dir", type=Path, default=Path("data"))
+    parser.add_argument("--backend", choices=("json", "jsonl", "sqlite"), default="jsonl",
+                        help="storage backend (the app uses jsonl)")
+    parser.add_argument("--profile", default=DEFAULT_PROFILE, help="character profile (created if missing)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="append records from a CSV, JSON or JSONL file")
+    p.add_argument("file", type=Path)
+    p.add_argument("--format", choices=importer.FORMATS, help="default: from the file extension")
+    p.add_argument("--batch-size", type=int, default=5000, help="records per storage write")
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser("export", help="write history to CSV or JSONL, optionally filtered")
+    p.add_argument("out", type=Path, help="output file, or - for stdout (JSONL unless --format csv)")
+    p.add_argument("--format", choices=exporter.FORMATS, help="default: from the file extension")
+    p.add_argument("--aspect")
+    p.add_argument("--aspect-level", type=int)
+    p.add_argument("--chain-level", type=int)
+    p.add_argument("--start", help="ISO date/time, inclusive")
+    p.add_argument("--end", help="ISO date/time, exclusive")
+    p.add_argument("--fields", help=f"comma-separated subset of: {','.join(FIELDS)}")
+    p.set_defaults(func=cmd_export)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
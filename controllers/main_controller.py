@@ -1,28 +1,45 @@
-from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem, QToolButton
+from PyQt5.QtWidgets import QFileDialog, QInputDialog, QMessageBox
 from datetime import datetime
-from services.storage_service import StorageService, StorageConfig
+import logging
+from models import rules
+from models.entry import Entry
+from services import exporter
+from services.profiles import ProfileManager
+from services.storage_service import StorageConfig
+from controllers.refresh_scheduler import RefreshScheduler
+from controllers.workers import BackgroundRunner
 from pathlib import Path
 from PyQt5.QtWidgets import QPushButton
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import QFileSystemWatcher, QTimer
+
+log = logging.getLogger(__name__)
 
 
 class MainController:
     """
     Globals
     """
-    ASPECT_XP_BY_LEVEL = {
-        0: 500, 1: 1000, 2: 1500, 3: 2000, 4: 2500, 5: 3000, 6: 3500, 7: 4000,
-        8: 4500, 9: 5000, 10: 15000, 11: 25000, 12: 40000, 13: 120000, 14: 250000
-    }
-
-    CHAIN_XP_BY_LEVEL = {
-        0: 250000, 1: 500000, 2: 750000, 3: 1000000, 4: 1250000, 5: 1500000,
-        6: 1750000, 7: 2000000, 8: 2250000, 9: 2500000, 10: 2750000, 11: 3000000,
-        12: 3250000, 13: 3500000, 14: 3750000, 15: 4000000, 16: 4250000,
-        17: 4500000, 18: 4750000, 19: 5000000, 20: 5250000, 21: 5500000,
-        22: 5750000, 23: 6000000, 24: 6250000, 25: 6500000, 26: 6750000,
-        27: 7000000, 28: 7250000, 29: 7500000
-    }
+    ASPECT_XP_BY_LEVEL = rules.ASPECT_XP_BY_LEVEL
+    CHAIN_XP_BY_LEVEL = rules.CHAIN_XP_BY_LEVEL
+
+    # Journal compaction waits for this much quiet time after the last save/delete
+    COMPACT_IDLE_MS = 10_000
+
+    # Progressive history fill: a screenful of the newest rows first, then
+    # older rows in chunks, one chunk per event-loop turn (the table model
+    # holds the whole frame and only reveals rows)
+    HISTORY_FIRST_ROWS = 200
+    HISTORY_FILL_CHUNK = 5000
+
+    # Graph views: the selected level only, lifetime XP across all levels,
+    # or XP gained per day/week at the selected level (rollup period)
+    VIEW_LEVEL = "Current level"
+    VIEW_TOTAL = "Total progress"
+    VIEW_DAILY = "Daily gain"
+    VIEW_WEEKLY = "Weekly gain"
+    VIEW_ALL = "All aspects"  # every aspect at the selected level, overlaid
+    VIEW_MODES = [VIEW_LEVEL, VIEW_TOTAL, VIEW_DAILY, VIEW_WEEKLY, VIEW_ALL]
+    ROLLUP_PERIODS = {VIEW_DAILY: "day", VIEW_WEEKLY: "week"}
 
     def __init__(self, window):
         self.window = window
@@ -32,31 +49,74 @@ class MainController:
         self.chain_xp = 0
 
         # storage must exist before refresh_* uses it
-        config = StorageConfig(data_dir=Path("data"))
-        self.storage = StorageService(config)
+        # Saves come in bursts after a session; write-behind turns each burst
+        # into one journal write instead of one per click
+        # Daily/weekly rollups are kept in a sidecar file between runs
+        config = StorageConfig(data_dir=Path("data"), backend="jsonl", write_behind=True, rollup_cache=True)
+        # One shard per character; only the active one (plus a few recently
+        # used ones) is ever loaded
+        self.profiles = ProfileManager(config)
+        self.profile = self.profiles.last_active()
+        self.storage = self.profiles.get(self.profile)
+
+        # Loading and series building run on a thread pool; the first load of
+        # each profile also compacts its journal
+        self.workers = BackgroundRunner()
+        self.history_ready = False
+        self._compacted_profiles = set()
+        # Watcher events that arrived while the file was being loaded/compacted
+        self._history_file_changed = False
+
+        # XP/h and ETA per series; created after the first load (numpy import)
+        self.analytics = None
+
+        self.history_fill_timer = QTimer()
+        self.history_fill_timer.setSingleShot(True)
+        self.history_fill_timer.setInterval(0)
+
+        # Full table rebuilds only happen on load or when the file is changed
+        # by something other than this app
+        self.history_watcher = QFileSystemWatcher()
+        self.watch_history_file()
+
+        # Deletes only write tombstones; fold them in once the user is idle
+        self.compact_timer = QTimer()
+        self.compact_timer.setSingleShot(True)
+        self.compact_timer.setInterval(self.COMPACT_IDLE_MS)
+
+        # Every refresh goes through here so signal storms collapse into
+        # one run of each refresh per event-loop turn
+        self.scheduler = RefreshScheduler({
+            RefreshScheduler.VALIDATION: self.validate_all,
+            RefreshScheduler.PROGRESS: self.refresh_progress_bars,
+            RefreshScheduler.HISTORY: self.refresh_history,
+            RefreshScheduler.GRAPHS: self.refresh_graphs,
+        })
 
         self.populate_dropdowns()
         self.connect_signals()
-        self.validate_all()
-
-        self.refresh_history()
-        self.refresh_graphs()
+        self.scheduler.invalidate(*RefreshScheduler.ALL)
 
     def populate_dropdowns(self):
         """
         Variables
         """
-        aspect_choices = ["Air", "Arcane", "Artisan", "Blood", "Command", "Death", "Discipline", "Earth", "Eldritch",
-                          "Fire", "Fortune", "Frost", "Gadget", "Harvest", "Holy", "Lightning", "Lyric",
-                          "Madness", "Poison", "Shadow", "Void", "War", "Water"]
-        aspect_levels = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15]
-
-        chain_levels = [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15, 16,
-                        17, 18, 19, 20, 21, 22, 23, 24, 25, 26, 27, 28, 29, 30]
+        aspect_choices = rules.ASPECTS
+        aspect_levels = rules.ASPECT_LEVELS
+        chain_levels = rules.CHAIN_LEVELS
 
         self.set_combo_items(self.window.aspect_combo, items = aspect_choices, placeholder="Select an aspect")
         self.set_combo_items(self.window.aspect_level_combo, items = aspect_levels)
         self.set_combo_items(self.window.chain_combo, items = chain_levels, placeholder="Select mastery chain level")
+        self.set_combo_items(self.window.view_combo, items = self.VIEW_MODES)
+        self.populate_profiles()
+
+    def populate_profiles(self):
+        # Directory names only; nothing is loaded here
+        self.set_combo_items(self.window.profile_combo, items = self.profiles.list_profiles())
+        self.window.profile_combo.blockSignals(True)
+        self.window.profile_combo.setCurrentText(self.profile)
+        self.window.profile_combo.blockSignals(False)
 
     def connect_signals(self):
 
@@ -67,6 +127,8 @@ class MainController:
         self.window.aspect_combo.currentIndexChanged.connect(self.on_aspect_changed)
         self.window.aspect_level_combo.currentIndexChanged.connect(self.on_aspect_level_changed)
         self.window.chain_combo.currentIndexChanged.connect(self.on_chain_level_changed)
+        self.window.view_combo.currentIndexChanged.connect(self.on_view_mode_changed)
+        self.window.legend_check.toggled.connect(self.on_legend_toggled)
 
         # Validate numeric input on edit finished
         self.window.aspect_xp_input.editingFinished.connect(self.on_aspect_xp_edited)
@@ -74,11 +136,24 @@ class MainController:
 
         # Save button:
         self.window.save_button.clicked.connect(self.on_save_clicked)
+        self.window.export_button.clicked.connect(self.on_export_clicked)
+
+        # Character profiles
+        self.window.profile_combo.currentTextChanged.connect(self.on_profile_changed)
+        self.window.new_profile_button.clicked.connect(self.on_new_profile_clicked)
+
+        # History file edited outside the app
+        self.history_watcher.fileChanged.connect(self.on_history_file_changed)
+        self.history_watcher.directoryChanged.connect(self.on_history_file_changed)
+
+        # Idle journal compaction
+        self.compact_timer.timeout.connect(self.on_compact_idle)
 
-        # Refresh graphs
-        self.window.aspect_combo.currentIndexChanged.connect(self.refresh_graphs)
-        self.window.aspect_level_combo.currentIndexChanged.connect(self.refresh_graphs)
-        self.window.chain_combo.currentIndexChanged.connect(self.refresh_graphs)
+        # Progressive history fill
+        self.history_fill_timer.timeout.connect(self.fill_history_chunk)
+
+        # Delete "x" drawn in the history table
+        self.window.history_delete_delegate.delete_requested.connect(self.on_history_delete_requested)
 
     #region Event Handlers
     # ---------------------------
@@ -89,7 +164,7 @@ class MainController:
         """
         Called when the Aspect Select dropdown changes.
         """
-        self.validate_all()
+        self.scheduler.invalidate(RefreshScheduler.VALIDATION, RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
         # Example idea: enable/disable inputs or update graphs
         # selected = self.window.aspect_combo.currentText()
 
@@ -97,26 +172,37 @@ class MainController:
         """
         Called when the Aspect Level dropdown changes.
         """
-        self.validate_all()
+        self.scheduler.invalidate(RefreshScheduler.VALIDATION, RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
 
     def on_chain_level_changed(self):
         """
         Called when the Chain Level dropdown changes.
         """
-        self.validate_all()
+        self.scheduler.invalidate(RefreshScheduler.VALIDATION, RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+
+    def on_view_mode_changed(self):
+        """
+        Called when the Graphs view dropdown changes.
+        """
+        self.window.legend_check.setEnabled(self.window.view_combo.currentText() == self.VIEW_ALL)
+        self.scheduler.invalidate(RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+
+    def on_legend_toggled(self, checked):
+        # Redraws the legend only; the series stay as they are
+        self.window.aspect_xp_graph.set_legend_visible(checked)
 
     def on_aspect_xp_edited(self):
         """
         Called when the Aspect XP line edit loses focus / user presses Enter.
         Great place for lightweight validation feedback.
         """
-        self.validate_all()
+        self.scheduler.invalidate(RefreshScheduler.VALIDATION)
 
     def on_chain_xp_edited(self):
         """
         Called when the Chain XP line edit loses focus / user presses Enter.
         """
-        self.validate_all()
+        self.scheduler.invalidate(RefreshScheduler.VALIDATION)
 
     def on_save_clicked(self):
         current_aspect = self.window.aspect_combo.currentText()
@@ -128,17 +214,93 @@ class MainController:
 
         current_time_stamp = datetime.now().isoformat(timespec="seconds")
 
-        entry = {
-            "timestamp": current_time_stamp,
-            "aspect": current_aspect,
-            "aspect_level": current_aspect_level,
-            "aspect_xp": current_aspect_xp,
-            "chain_level": current_chain_level,
-            "chain_xp": current_chain_xp,
-        }
+        entry = Entry(
+            timestamp=current_time_stamp,
+            aspect=current_aspect,
+            aspect_level=current_aspect_level,
+            aspect_xp=current_aspect_xp,
+            chain_level=current_chain_level,
+            chain_xp=current_chain_xp,
+        ).to_record()
         self.storage.append_record(entry)
-        self.refresh_history()
-        self.refresh_graphs()
+        if self.history_ready:
+            self.window.history_model.append_record(entry)
+        else:
+            # A load is in flight and may predate this entry; load again
+            self.scheduler.invalidate(RefreshScheduler.HISTORY)
+        self.scheduler.invalidate(RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+
+        if self.compact_timer.isActive():
+            self.compact_timer.start()  # still busy: push compaction back
+
+    def on_profile_changed(self, name):
+        if name and name != self.profile:
+            self.switch_profile(name)
+
+    def on_new_profile_clicked(self):
+        name, ok = QInputDialog.getText(self.window, "New profile", "Character name:")
+        if not ok or not name.strip():
+            return
+        try:
+            name = self.profiles.create(name)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self.window, "XP Tracker", f"Could not create profile:\n\n{e}")
+            return
+        self.switch_profile(name)
+        self.populate_profiles()
+
+    def switch_profile(self, name):
+        """
+        Make `name` the active profile. Its history loads in the background
+        like at startup; other profiles are left alone.
+        """
+        # Results still in flight belong to the old profile
+        self.workers.cancel("history")
+        self.workers.cancel("graphs")
+        self.workers.cancel("compact")
+        self.compact_timer.stop()
+        self.history_fill_timer.stop()
+
+        self.profile = name
+        self.storage = self.profiles.get(name)
+        if self.analytics is not None:
+            self.analytics.clear()
+        self.window.summary_model.set_rows([])
+        self.profiles.remember_active(name)
+
+        self.history_ready = False
+        self.window.history_model.set_records([])
+        self.history_watcher.removePaths(self.history_watcher.files() + self.history_watcher.directories())
+        self.watch_history_file()
+        self.scheduler.invalidate(RefreshScheduler.HISTORY, RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+
+    def on_export_clicked(self):
+        path, selected = QFileDialog.getSaveFileName(
+            self.window, "Export history", "xp_history.csv",
+            "CSV (*.csv);;JSON Lines (*.jsonl)",
+        )
+        if not path:
+            return
+
+        fmt = "jsonl" if selected.startswith("JSON") else "csv"
+        if Path(path).suffix.lower() not in (".csv", ".jsonl"):
+            path += "." + fmt
+
+        # Streams from storage on a worker; the UI stays responsive
+        self.window.export_button.setEnabled(False)
+        self.workers.submit(
+            "export", exporter.export_records, self.storage, Path(path), fmt,
+            on_done=lambda count: self.on_export_done(path, count),
+            on_error=self.on_export_failed,
+        )
+
+    def on_export_done(self, path, count):
+        self.window.export_button.setEnabled(True)
+        QMessageBox.information(self.window, "XP Tracker", f"Exported {count:,} records to\n{path}")
+
+    def on_export_failed(self, message):
+        self.window.export_button.setEnabled(True)
+        QMessageBox.warning(self.window, "XP Tracker", f"Export failed:\n\n{message}")
 
     #endregion
 
@@ -147,137 +309,190 @@ class MainController:
     # ---------------------------
 
     def refresh_history(self):
-        records = list(reversed(self.storage.load_history()))
-        table = self.window.history_table
-
-        table.setRowCount(0)
-        table.setColumnCount(7)  # keep consistent even if empty
-
-        if not records:
-            return
-
-        table.setRowCount(len(records))
+        """
+        Full reload, done on a worker thread. Graphs and progress bars wait
+        for it (history_ready) and are re-invalidated when it lands.
+        """
+        self.history_ready = False
+        self.window.set_history_loading(True)
+        self.history_fill_timer.stop()
+
+        compact = self.profile not in self._compacted_profiles
+        self._compacted_profiles.add(self.profile)
+        self.workers.submit(
+            "history", self.load_history_snapshot, compact,
+            on_done=self.on_history_loaded, on_error=self.on_history_load_failed,
+        )
 
-        for row, record in enumerate(records):
-            ts_raw = record.get("timestamp", "")
-            try:
-                ts_display = datetime.fromisoformat(ts_raw).strftime("%B %d, %Y")
-            except ValueError:
-                ts_display = ts_raw
-
-            values = [
-                ts_display,
-                record.get("aspect", ""),
-                str(record.get("aspect_level", "")),
-                f"{record['aspect_xp']:,}",
-                str(record.get("chain_level", "")),
-                f"{record['chain_xp']:,}",
-            ]
-
-            # Fill columns 0..5
-            for col, value in enumerate(values):
-                table.setItem(row, col, QTableWidgetItem(value))
-
-            # Delete button in column 6 (once per row)
-            delete_btn = QToolButton()
-            delete_btn.setText("x")
-            delete_btn.setObjectName("deleteButton")
-            delete_btn.setToolTip("Delete entry")
-            delete_btn.setFixedSize(18, 18)
-            delete_btn.setCursor(Qt.PointingHandCursor)
-            delete_btn.setProperty("timestamp", record.get("timestamp", ""))
-            delete_btn.clicked.connect(lambda _, ts=record["timestamp"]: self.on_delete_row_clicked(ts))
-
-            table.setCellWidget(row, 6, delete_btn)
+    def load_history_snapshot(self, compact=False):
+        # Runs on a worker thread
+        if compact:
+            # Fold deletes from previous sessions back into the journal
+            self.storage.compact()
+        frame = self.storage.load_frame()
+        self.storage.history_index()  # build the series index here, not on the GUI thread
+        import services.analytics  # noqa: F401  (pays for numpy here, not on the GUI thread)
+        return frame
+
+    def on_history_loaded(self, frame):
+        self.window.history_model.set_frame(frame, shown=self.HISTORY_FIRST_ROWS)
+        self.window.set_history_loading(False)
+        # Graphs and progress bars read the storage index, not the table,
+        # so they don't wait for the fill
+        self.history_ready = True
+        self.scheduler.invalidate(RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+        if self.window.history_model.hidden_count():
+            self.history_fill_timer.start()
+        self.recheck_history_file()
+
+    def fill_history_chunk(self):
+        if self.window.history_model.show_older(self.HISTORY_FILL_CHUNK):
+            self.history_fill_timer.start()
 
     def refresh_graphs(self):
-        records = self.storage.load_history()
-
-        # ---------- Graph 1: Aspect XP over time (selected aspect + selected level) ----------
-        if self.window.aspect_combo.currentIndex() == 0 or self.window.aspect_level_combo.currentIndex() == 0:
-            self.window.aspect_xp_graph.plot_timeseries([], [], "Aspect XP Over Time", "XP")
-        else:
-            selected_aspect = self.window.aspect_combo.currentText()
+        if not self.history_ready:
+            return  # on_history_loaded() asks again
+
+        # Read the combos here; the series themselves are copied on a worker.
+        # A newer request drops this one's result.
+        aspect, level, chain_level = self.graph_selection()
+        mode = self.window.view_combo.currentText()
+        if mode == self.VIEW_TOTAL and self.window.aspect_combo.currentIndex() > 0:
+            aspect = self.window.aspect_combo.currentText()  # every level, so none needs selecting
+        if mode == self.VIEW_ALL and self.window.aspect_level_combo.currentIndex() > 0:
+            level = int(self.window.aspect_level_combo.currentText())  # every aspect
+        self.workers.submit(
+            "graphs", self.build_graph_series, mode, aspect, level, chain_level,
+            on_done=self.on_graph_series_ready, on_error=self.on_graph_build_failed,
+        )
 
+    def graph_selection(self):
+        """
+        (aspect, aspect level, chain level) selected for the graphs; None
+        where nothing usable is selected.
+        """
+        selected_aspect = selected_level = None
+        if self.window.aspect_combo.currentIndex() != 0 and self.window.aspect_level_combo.currentIndex() != 0:
             # Convert selected aspect level to int
             level_text = self.window.aspect_level_combo.currentText()
             try:
                 selected_level = int(level_text)
+                selected_aspect = self.window.aspect_combo.currentText()
             except ValueError:
                 selected_level = None
 
-            if selected_level is None:
-                self.window.aspect_xp_graph.plot_timeseries([], [], "Aspect XP Over Time", "XP")
-            else:
-                aspect_points = []
-                for r in records:
-                    if r.get("aspect") != selected_aspect:
-                        continue
-                    if r.get("aspect_level") != selected_level:
-                        continue
-
-                    ts = r.get("timestamp", "")
-                    try:
-                        dt = datetime.fromisoformat(ts)
-                    except ValueError:
-                        continue
-
-                    axp = r.get("aspect_xp", None)
-                    if axp is None:
-                        continue
-
-                    aspect_points.append((dt, int(axp)))
+        selected_chain_level = None
+        if self.window.chain_combo.currentIndex() != 0:
+            # Convert selected chain level to int if possible
+            chain_text = self.window.chain_combo.currentText()
+            try:
+                selected_chain_level = int(chain_text)
+            except ValueError:
+                # If your combo items are like "Level 2", parse digits instead
+                digits = "".join(ch for ch in chain_text if ch.isdigit())
+                selected_chain_level = int(digits) if digits else None
+
+        return selected_aspect, selected_level, selected_chain_level
+
+    def build_graph_series(self, mode, aspect, level, chain_level):
+        # Runs on a worker thread
+        if mode == self.VIEW_TOTAL:
+            from services.analytics import lifetime_series
+
+            aspect_series = None
+            if aspect is not None:
+                by_level = self.storage.aspect_series_by_level(aspect)
+                aspect_series = lifetime_series(by_level, rules.ASPECT_XP_BEFORE_LEVEL)
+            chain_series = lifetime_series(self.storage.chain_series_by_level(), rules.CHAIN_XP_BEFORE_LEVEL)
+            return mode, aspect, level, aspect_series, chain_level, chain_series
+
+        if mode in self.ROLLUP_PERIODS:
+            from services.rollups import PERIODS
+
+            period = self.ROLLUP_PERIODS[mode]
+            width = PERIODS[period][0]
+            aspect_series = chain_series = None
+            if aspect is not None:
+                buckets = self.storage.aspect_rollup(aspect, level, period)
+                aspect_series = (buckets["start"], buckets["gain"], width)
+            if chain_level is not None:
+                buckets = self.storage.chain_rollup(chain_level, period)
+                chain_series = (buckets["start"], buckets["gain"], width)
+            return mode, aspect, level, aspect_series, chain_level, chain_series
+
+        if mode == self.VIEW_ALL:
+            # Fixed order (and so fixed colours); empty series included
+            aspect_series = None
+            if level is not None:
+                aspect_series = [(name, *self.storage.aspect_series(name, level)) for name in rules.ASPECTS]
+        else:
+            aspect_series = self.storage.aspect_series(aspect, level) if aspect is not None else None
+        chain_series = self.storage.chain_series(chain_level) if chain_level is not None else None
+        return mode, aspect, level, aspect_series, chain_level, chain_series
 
-                aspect_points.sort(key=lambda t: t[0])
-                x1 = [p[0] for p in aspect_points]
-                y1 = [p[1] for p in aspect_points]
+    def on_graph_series_ready(self, result):
+        mode, aspect, level, aspect_series, chain_level, chain_series = result
 
+        if mode == self.VIEW_TOTAL:
+            if aspect_series is None:
+                self.window.aspect_xp_graph.plot_timeseries([], [], "Aspect Lifetime XP", "Total XP")
+            else:
                 self.window.aspect_xp_graph.plot_timeseries(
-                    x1, y1, f"{selected_aspect} XP (Level {selected_level}) Over Time", "XP"
+                    *aspect_series, f"{aspect} Lifetime XP (All Levels)", "Total XP"
                 )
-
-        # ---------- Graph 2: Mastery Chain XP over time (selected chain level) ----------
-        if self.window.chain_combo.currentIndex() == 0:
-            self.window.aspect_level_graph.plot_timeseries([], [], "Mastery Chain XP Over Time", "XP")
+            self.window.aspect_level_graph.plot_timeseries(
+                *chain_series, "Mastery Chain Lifetime XP (All Levels)", "Total XP"
+            )
             return
 
-        # Convert selected chain level to int if possible
-        chain_text = self.window.chain_combo.currentText()
-        try:
-            selected_chain_level = int(chain_text)
-        except ValueError:
-            # If your combo items are like "Level 2", parse digits instead
-            digits = "".join(ch for ch in chain_text if ch.isdigit())
-            selected_chain_level = int(digits) if digits else None
-
-        if selected_chain_level is None:
-            self.window.aspect_level_graph.plot_timeseries([], [], "Mastery Chain XP Over Time", "XP")
+        if mode in self.ROLLUP_PERIODS:
+            per = "Day" if mode == self.VIEW_DAILY else "Week"
+            if aspect_series is None:
+                self.window.aspect_xp_graph.plot_buckets([], [], 1, f"Aspect XP per {per}", "XP gained")
+            else:
+                self.window.aspect_xp_graph.plot_buckets(
+                    *aspect_series, f"{aspect} XP per {per} (Level {level})", "XP gained"
+                )
+            if chain_series is None:
+                self.window.aspect_level_graph.plot_buckets([], [], 1, f"Mastery Chain XP per {per}", "XP gained")
+            else:
+                self.window.aspect_level_graph.plot_buckets(
+                    *chain_series, f"Mastery Chain XP per {per} (Level {chain_level})", "XP gained"
+                )
             return
 
-        chain_points = []
-        for r in records:
-            if r.get("chain_level") != selected_chain_level:
-                continue
-
-            ts = r.get("timestamp", "")
-            try:
-                dt = datetime.fromisoformat(ts)
-            except ValueError:
-                continue
-
-            cxp = r.get("chain_xp", None)
-            if cxp is None:
-                continue
+        # ---------- Graph 1: Aspect XP over time (selected aspect + selected level) ----------
+        if mode == self.VIEW_ALL:
+            if aspect_series is None:
+                self.window.aspect_xp_graph.plot_timeseries([], [], "All Aspects XP Over Time", "XP")
+            else:
+                self.window.aspect_xp_graph.plot_overlay(
+                    aspect_series, f"All Aspects XP (Level {level}) Over Time", "XP"
+                )
+        elif aspect_series is None:
+            self.window.aspect_xp_graph.plot_timeseries([], [], "Aspect XP Over Time", "XP")
+        else:
+            x1, y1 = aspect_series
+            self.window.aspect_xp_graph.plot_timeseries(
+                x1, y1, f"{aspect} XP (Level {level}) Over Time", "XP"
+            )
 
-            chain_points.append((dt, int(cxp)))
+        # ---------- Graph 2: Mastery Chain XP over time (selected chain level) ----------
+        if chain_series is None:
+            self.window.aspect_level_graph.plot_timeseries([], [], "Mastery Chain XP Over Time", "XP")
+        else:
+            x2, y2 = chain_series
+            self.window.aspect_level_graph.plot_timeseries(
+                x2, y2, f"Mastery Chain XP (Level {chain_level}) Over Time", "XP"
+            )
 
-        chain_points.sort(key=lambda t: t[0])
-        x2 = [p[0] for p in chain_points]
-        y2 = [p[1] for p in chain_points]
+    def on_history_load_failed(self, message):
+        self.window.set_history_loading(False)
+        self.recheck_history_file()
+        QMessageBox.warning(self.window, "XP Tracker", f"Could not load history:\n\n{message}")
 
-        self.window.aspect_level_graph.plot_timeseries(
-            x2, y2, f"Mastery Chain XP (Level {selected_chain_level}) Over Time", "XP"
-        )
+    def on_graph_build_failed(self, message):
+        QMessageBox.warning(self.window, "XP Tracker", f"Could not build graphs:\n\n{message}")
 
     # ---------------------------
     # Helpers
@@ -318,11 +533,15 @@ class MainController:
         all_ok = aspect_ok and level_ok and chain_ok and aspect_xp_ok and chain_xp_ok
         self.window.save_button.setEnabled(all_ok)
 
-        # ---- Progress Bars validity ----
-        self.refresh_progress_bars()
-
     def refresh_progress_bars(self):
-        records = self.storage.load_history()
+        if not self.history_ready:
+            return  # on_history_loaded() asks again
+        index = self.storage.history_index()
+
+        if self.window.view_combo.currentText() == self.VIEW_TOTAL:
+            self.refresh_lifetime_progress(index)
+            self.refresh_summary(index)
+            return
 
         # ---------------- Aspect progress (by selected aspect + selected level) ----------------
         level_idx = self.window.aspect_level_combo.currentIndex()
@@ -337,20 +556,18 @@ class MainController:
 
             max_xp = self.ASPECT_XP_BY_LEVEL.get(selected_level, 0)
 
-            # Find latest matching record (scan from end)
-            latest_xp = None
-            for r in reversed(records):
-                if r.get("aspect") == selected_aspect and r.get("aspect_level") == selected_level:
-                    latest_xp = int(r.get("aspect_xp", 0))
-                    break
+            latest_xp = index.latest_aspect_xp(selected_aspect, selected_level)
 
             if latest_xp is None or max_xp <= 0:
                 self.window.aspect_progress_bar.setValue(0)
                 self.window.aspect_progress_bar.setFormat(f"0 / {max_xp} (0%)" if max_xp else "0%")
             else:
                 pct = max(0, min(100, int((latest_xp / max_xp) * 100)))
+                stats = self.xp_analytics().aspect_stats(index, selected_aspect, selected_level)
                 self.window.aspect_progress_bar.setValue(pct)
-                self.window.aspect_progress_bar.setFormat(f"{latest_xp:,} / {max_xp:,} ({pct}%)")
+                self.window.aspect_progress_bar.setFormat(
+                    f"{latest_xp:,} / {max_xp:,} ({pct}%)" + self._rate_text(stats)
+                )
 
         # ---------------- Chain progress (by selected chain level) ----------------
         chain_idx = self.window.chain_combo.currentIndex()
@@ -361,34 +578,157 @@ class MainController:
             selected_chain_level = int(self.window.chain_combo.currentText())
             max_xp = self.CHAIN_XP_BY_LEVEL.get(selected_chain_level, 0)
 
-            latest_xp = None
-            for r in reversed(records):
-                if r.get("chain_level") == selected_chain_level:
-                    latest_xp = int(r.get("chain_xp", 0))
-                    break
+            latest_xp = index.latest_chain_xp(selected_chain_level)
 
             if latest_xp is None or max_xp <= 0:
                 self.window.chain_progress_bar.setValue(0)
                 self.window.chain_progress_bar.setFormat(f"0 / {max_xp} (0%)" if max_xp else "—")
             else:
                 pct = max(0, min(100, int((latest_xp / max_xp) * 100)))
+                stats = self.xp_analytics().chain_stats(index, selected_chain_level)
                 self.window.chain_progress_bar.setValue(pct)
-                self.window.chain_progress_bar.setFormat(f"{latest_xp} / {max_xp} ({pct}%)")
+                self.window.chain_progress_bar.setFormat(
+                    f"{latest_xp} / {max_xp} ({pct}%)" + self._rate_text(stats)
+                )
+
+        self.refresh_summary(index)
+
+    def refresh_lifetime_progress(self, index):
+        """
+        Total progress view: lifetime XP at the newest entry's level, out of
+        the XP of a fully levelled curve. Lookups are O(1) prefix-sum reads.
+        """
+        aspect_level = aspect_xp = None
+        if self.window.aspect_combo.currentIndex() > 0:
+            aspect = self.window.aspect_combo.currentText()
+            aspect_level = index.current_aspect_levels().get(aspect)
+            if aspect_level is not None:
+                aspect_xp = index.latest_aspect_xp(aspect, aspect_level)
+        self._set_lifetime_bar(
+            self.window.aspect_progress_bar, aspect_level, aspect_xp,
+            rules.lifetime_aspect_xp, rules.ASPECT_XP_TOTAL,
+        )
+
+        chain_level = index.current_chain_level()
+        chain_xp = index.latest_chain_xp(chain_level) if chain_level is not None else None
+        self._set_lifetime_bar(
+            self.window.chain_progress_bar, chain_level, chain_xp,
+            rules.lifetime_chain_xp, rules.CHAIN_XP_TOTAL,
+        )
+
+    @staticmethod
+    def _set_lifetime_bar(bar, level, xp, lifetime_xp, total_xp):
+        if xp is None:
+            bar.setValue(0)
+            bar.setFormat("—")
+            return
+        lifetime = lifetime_xp(level, xp)
+        pct = max(0, min(100, int(lifetime / total_xp * 100)))
+        bar.setValue(pct)
+        bar.setFormat(f"{lifetime:,} / {total_xp:,} lifetime (level {level}, {pct}%)")
+
+    def refresh_summary(self, index):
+        """
+        Rate/ETA table for every aspect at its current level and the chain.
+        Series arrays are cached, so after a save this only extends the ones
+        that changed.
+        """
+        from services.analytics import format_eta, format_rate
+
+        rows = []
+        for name, level, stats in self.xp_analytics().summary(index):
+            xp = f"{stats.latest_xp:,}" if stats.threshold is None else f"{stats.latest_xp:,} / {stats.threshold:,}"
+            gain = f"+{stats.session_gain:,}" if stats.session_gain else "—"
+            rows.append((name, str(level), xp, format_rate(stats.xp_per_hour), gain, format_eta(stats.eta_hours)))
+        self.window.summary_model.set_rows(rows)
+
+    def xp_analytics(self):
+        if self.analytics is None:
+            # Already imported by the history load (see load_history_snapshot)
+            from services.analytics import XpAnalytics
+            self.analytics = XpAnalytics()
+        return self.analytics
+
+    @staticmethod
+    def _rate_text(stats):
+        from services.analytics import format_eta, format_rate
+
+        if stats is None or not stats.xp_per_hour:
+            return ""
+        return f"  ·  {format_rate(stats.xp_per_hour)}  ·  ETA {format_eta(stats.eta_hours)}"
 
     def _set_valid(self, widget, is_valid: bool):
         widget.setProperty("valid", "true" if is_valid else "false")
         widget.style().unpolish(widget)  # force stylesheet refresh
         widget.style().polish(widget)
 
+    def on_history_delete_requested(self, row):
+        self.on_delete_row_clicked(self.window.history_model.timestamp_at(row))
+
     def on_delete_row_clicked(self, ts_iso):
         if not ts_iso:
             return
 
-        records = self.storage.load_history()
-        new_records = [r for r in records if r.get("timestamp") != ts_iso]
-        self.storage.save_history(new_records)
+        self.storage.delete_record(ts_iso)
+        if self.history_ready:
+            # Also drops older copies still waiting to be filled in
+            self.window.history_model.remove_timestamp(ts_iso)
+        else:
+            self.scheduler.invalidate(RefreshScheduler.HISTORY)
+
+        self.scheduler.invalidate(RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+        self.compact_timer.start()
+
+    def on_compact_idle(self):
+        # Rewrites the journal on a worker; saves made meanwhile are kept
+        # (see StorageService.compact)
+        self.workers.submit(
+            "compact", self.storage.compact_if_needed,
+            on_done=lambda _compacted: self.recheck_history_file(),
+            on_error=self.on_compact_failed,
+        )
+
+    def on_compact_failed(self, message):
+        # The old journal is still intact; the next idle period tries again
+        log.warning("Journal compaction failed:\n%s", message)
+        self.recheck_history_file()
 
-        self.refresh_history()
-        self.refresh_graphs()
+    def on_history_file_changed(self, _path):
+        # Atomic replaces (compaction) swap the inode, which drops the watch
+        self.watch_history_file()
 
+        if self.workers.is_busy("history") or self.workers.is_busy("compact"):
+            # Most likely our own compaction; look again once it's done
+            self._history_file_changed = True
+            return
 
+        if self.storage.is_stale():
+            # Progress runs before the reload; it must wait for the worker,
+            # not re-read the file itself on this thread
+            self.history_ready = False
+            self.scheduler.invalidate(RefreshScheduler.HISTORY, RefreshScheduler.PROGRESS, RefreshScheduler.GRAPHS)
+
+    def recheck_history_file(self):
+        if self._history_file_changed:
+            self._history_file_changed = False
+            self.on_history_file_changed(None)
+
+    def watch_history_file(self):
+        path = self.storage.data_path
+        watched = set(self.history_watcher.files()) | set(self.history_watcher.directories())
+
+        for target in (path.parent, path):
+            if target.exists() and str(target) not in watched:
+                self.history_watcher.addPath(str(target))
+
+    def shutdown(self):
+        """
+        Called on application exit: write out anything still queued.
+        """
+        self.compact_timer.stop()
+        self.history_fill_timer.stop()
+        self.workers.cancel("history")
+        self.workers.cancel("graphs")
+        self.workers.cancel("export")
+        self.workers.cancel("compact")
+        self.profiles.close_all()
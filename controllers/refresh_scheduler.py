@@ -0,0 +1,49 @@
+from PyQt5.QtCore import QTimer
+
+
+class RefreshScheduler:
+    """
+    Collects "this part of the UI is out of date" flags and runs each refresh
+    at most once per event-loop turn, via a zero-delay single-shot QTimer.
+
+    A combo change that used to trigger validate_all + refresh_progress_bars +
+    refresh_graphs from several signal connections now just marks parts dirty.
+    """
+    VALIDATION = "validation"
+    PROGRESS = "progress"
+    HISTORY = "history"
+    GRAPHS = "graphs"
+
+    # Cheap parts first so the window looks right as early as possible
+    ORDER = (VALIDATION, PROGRESS, HISTORY, GRAPHS)
+    ALL = ORDER
+
+    def __init__(self, handlers):
+        """
+        handlers: part name -> zero-argument refresh callable
+        """
+        self._handlers = handlers
+        self._dirty = set()
+
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    def invalidate(self, *parts):
+        self._dirty.update(parts)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def is_pending(self, part=None):
+        return bool(self._dirty) if part is None else part in self._dirty
+
+    def flush(self):
+        """
+        Run pending refreshes now (also called by the timer).
+        """
+        self._timer.stop()
+        dirty, self._dirty = self._dirty, set()
+        for part in self.ORDER:
+            if part in dirty:
+                self._handlers[part]()
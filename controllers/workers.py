@@ -0,0 +1,85 @@
+import itertools
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskSignals(QObject):
+    # Created on the GUI thread, so emits from the worker are queued back to it
+    finished = pyqtSignal(int, object)  # request id, result
+    failed = pyqtSignal(int, str)       # request id, error message
+
+
+class Task(QRunnable):
+    """
+    Runs fn(*args) on a pool thread and reports back through TaskSignals.
+    """
+    def __init__(self, request_id, fn, args):
+        super().__init__()
+        self.request_id = request_id
+        self.signals = TaskSignals()
+        # Python owns the task: BackgroundRunner may still call tryTake() on
+        # it after it ran, before its result has been delivered
+        self.setAutoDelete(False)
+        self._fn = fn
+        self._args = args
+
+    def run(self):
+        try:
+            result = self._fn(*self._args)
+        except Exception:
+            self.signals.failed.emit(self.request_id, traceback.format_exc(limit=3))
+        else:
+            self.signals.finished.emit(self.request_id, result)
+
+
+class BackgroundRunner:
+    """
+    Submits work to a QThreadPool in named channels ("history", "graphs", ...).
+
+    Only the newest request per channel counts: submitting again removes the
+    previous task if it hasn't started yet, and drops its result if it has.
+    Callbacks always run on the GUI thread.
+    """
+    def __init__(self, pool=None):
+        self._pool = pool or QThreadPool.globalInstance()
+        self._ids = itertools.count(1)
+        self._latest = {}   # channel -> newest request id
+        self._pending = {}  # channel -> queued/running Task (keeps it alive)
+
+    def submit(self, channel, fn, *args, on_done, on_error=None):
+        self.cancel(channel)
+
+        request_id = next(self._ids)
+        self._latest[channel] = request_id
+
+        task = Task(request_id, fn, args)
+        task.signals.finished.connect(
+            lambda rid, result: self._deliver(channel, rid, on_done, result)
+        )
+        task.signals.failed.connect(
+            lambda rid, message: self._deliver(channel, rid, on_error, message)
+        )
+        self._pending[channel] = task
+        self._pool.start(task)
+        return request_id
+
+    def cancel(self, channel):
+        """
+        Forget the current request on `channel` (dequeue it if not started).
+        """
+        task = self._pending.pop(channel, None)
+        if task is not None:
+            self._pool.tryTake(task)
+        self._latest.pop(channel, None)
+
+    def is_busy(self, channel):
+        return channel in self._pending
+
+    def _deliver(self, channel, request_id, callback, payload):
+        if self._latest.get(channel) != request_id:
+            return  # superseded
+        self._pending.pop(channel, None)
+        self._latest.pop(channel, None)
+        if callback is not None:
+            callback(payload)
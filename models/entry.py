@@ -0,0 +1,432 @@
+"""
+Compact in-memory history.
+
+Entry is one record as a small immutable object. HistoryFrame holds a whole
+history as typed columns instead of a list of dicts:
+
+  timestamp      int64 microseconds since 1970 (utils.timestamps)
+  aspect         int16 code into the frame's aspect names (models.rules
+                 ASPECTS first; unknown names are interned on sight)
+  aspect_level,
+  chain_level    int16
+  aspect_xp,
+  chain_xp       int64
+
+Missing or unusable values are stored as the column's minimum value and read
+back as None; integral floats (1200.0) are stored as ints. Timestamp strings
+that don't round-trip through the int64 (hand-edited files, timezone
+offsets, junk) are kept verbatim in a small side table, and so are whole
+records the columns can't give back exactly (extra keys, floats, bools,
+out-of-range numbers): records always come back as they were read, so
+rewriting the journal from a frame loses nothing.
+
+Bulk loads, filters and deletes are vectorized with numpy (imported on
+first use).
+"""
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from models.rules import ASPECTS, FIELDS
+from utils.timestamps import round_trips, timestamp_to_us, us_to_timestamp
+
+MISSING_TS = -(1 << 63)
+MISSING_SMALL = -(1 << 15)
+MISSING_XP = -(1 << 63)
+
+_BATCH = 1 << 16
+_MIN_US = timestamp_to_us("0001-01-01T00:00:00")
+
+_COLUMNS = (
+    # attribute, array typecode, numpy dtype
+    ("_ts", "q", "int64"),
+    ("_aspect", "h", "int16"),
+    ("_aspect_level", "h", "int16"),
+    ("_aspect_xp", "q", "int64"),
+    ("_chain_level", "h", "int16"),
+    ("_chain_xp", "q", "int64"),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Entry:
+    """
+    One history record.
+    """
+    timestamp: str
+    aspect: Optional[str]
+    aspect_level: Optional[int]
+    aspect_xp: Optional[int]
+    chain_level: Optional[int]
+    chain_xp: Optional[int]
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "Entry":
+        return cls(*(record.get(name) for name in FIELDS))
+
+    def to_record(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in FIELDS}
+
+
+_INT_FIELDS = (
+    # attribute, field, missing value
+    ("_aspect_level", "aspect_level", MISSING_SMALL),
+    ("_aspect_xp", "aspect_xp", MISSING_XP),
+    ("_chain_level", "chain_level", MISSING_SMALL),
+    ("_chain_xp", "chain_xp", MISSING_XP),
+)
+
+
+def _value(raw: int, missing: int) -> Optional[int]:
+    return None if raw == missing else raw
+
+
+def _coerce(value: Any, missing: int) -> int:
+    # The column value: an int, or an integral float, if it fits
+    if type(value) is float and value.is_integer():
+        value = int(value)
+    if type(value) is int and missing < value < -missing:
+        return value
+    return missing
+
+
+def _fits(record: Dict[str, Any]) -> bool:
+    # True if the columns (+ the timestamp side table) give `record` back exactly
+    if len(record) != len(FIELDS) or any(name not in record for name in FIELDS):
+        return False
+    aspect = record["aspect"]
+    if aspect is not None and not isinstance(aspect, str):
+        return False
+    for _, name, missing in _INT_FIELDS:
+        value = record[name]
+        if value is not None and (type(value) is not int or not missing < value < -missing):
+            return False
+    return True
+
+
+class HistoryFrame:
+    """
+    Columnar history, oldest first (storage order). Row i is record i.
+
+    Appends are amortized O(1); everything that drops rows returns a new
+    frame, so a frame being read on another thread never shifts under it.
+    """
+    __slots__ = ("_ts", "_aspect", "_aspect_level", "_aspect_xp", "_chain_level", "_chain_xp",
+                 "_names", "_codes", "_odd", "_verbatim")
+
+    def __init__(self, names: Optional[List[str]] = None):
+        for attr, typecode, _ in _COLUMNS:
+            setattr(self, attr, array(typecode))
+        self._names: List[str] = list(ASPECTS if names is None else names)
+        self._codes: Dict[str, int] = {name: code for code, name in enumerate(self._names)}
+        # row -> original timestamp value, for rows whose string doesn't round-trip
+        self._odd: Dict[int, Any] = {}
+        # row -> original record, for rows the columns can't reproduce (_fits())
+        self._verbatim: Dict[int, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "HistoryFrame":
+        frame = cls()
+        frame.extend(records)
+        return frame
+
+    def __len__(self):
+        return len(self._ts)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, attr).itemsize * len(self._ts) for attr, _, _ in _COLUMNS)
+
+    # -------------------------
+    # Appends
+    # -------------------------
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.extend((record,))
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        # Column at a time, in batches: a comprehension per field and a C-level
+        # array.fromlist() cost far less than six appends per record
+        batch: List[Dict[str, Any]] = []
+        for record in records:
+            if isinstance(record, dict):
+                batch.append(record)
+                if len(batch) == _BATCH:
+                    self._extend_batch(batch)
+                    batch = []
+        if batch:
+            self._extend_batch(batch)
+
+    def _extend_batch(self, records: List[Dict[str, Any]]) -> None:
+        first = len(self._ts)
+        self._ts.fromlist(self._timestamps(first, [r.get("timestamp") for r in records]))
+
+        # Rows that may not read back exactly, checked with _fits() at the end.
+        # The common case (six keys, str aspects, int values) never gets here.
+        suspect = set()
+        if set(map(len, records)) != {len(FIELDS)}:
+            suspect.update(i for i, r in enumerate(records) if len(r) != len(FIELDS))
+
+        names = [r.get("aspect") for r in records]
+        try:
+            codes = [self._codes[name] for name in names]
+        except (KeyError, TypeError):
+            codes = [self._code(name) for name in names]
+            suspect.update(i for i, name in enumerate(names) if not isinstance(name, str))
+        self._aspect.fromlist(codes)
+
+        for attr, field, missing in _INT_FIELDS:
+            values = [r.get(field) for r in records]
+            column = getattr(self, attr)
+            try:
+                if set(map(type, values)) != {int}:
+                    raise TypeError  # None, bool, float, ...
+                column.fromlist(values)  # unchanged if a value doesn't fit
+            except (TypeError, OverflowError):
+                ints = [_coerce(value, missing) for value in values]
+                column.fromlist(ints)
+                suspect.update(
+                    i for i, (value, n) in enumerate(zip(values, ints))
+                    if n == missing or type(value) is not int
+                )
+
+        for i in suspect:
+            if not _fits(records[i]):
+                self._verbatim[first + i] = dict(records[i])
+
+    def _timestamps(self, first: int, stamps: List[Any]) -> List[int]:
+        # int64 values for a batch of timestamp values starting at row `first`,
+        # noting the ones that don't round-trip in self._odd
+        values, rows = None, range(len(stamps))
+        if len(stamps) >= 64:
+            # numpy does the round_trips() check and the parse for the whole
+            # batch, ~20x faster than datetime per item. Small batches (a save
+            # from the UI) don't pay for the numpy import.
+            values, rows = self._parse_batch(stamps)
+        if values is None:
+            values = [0] * len(stamps)
+
+        for i in rows:
+            stamp = stamps[i]
+            us = timestamp_to_us(stamp) if isinstance(stamp, str) else None
+            if us is None or not round_trips(stamp):
+                self._odd[first + i] = stamp
+            values[i] = MISSING_TS if us is None else us
+        return values
+
+    @staticmethod
+    def _parse_batch(stamps: List[Any]):
+        # (values, rows still to do one by one), or (None, all rows)
+        import numpy as np
+
+        everything = range(len(stamps))
+        text = [stamp if type(stamp) is str else "" for stamp in stamps]
+        try:
+            raw = np.array(text, dtype="S19")  # ASCII only, like round_trips()
+        except UnicodeEncodeError:
+            return None, everything
+        lengths = np.fromiter(map(len, text), dtype=np.int64, count=len(text))
+        chars = np.frombuffer(raw.tobytes(), dtype=np.uint8).reshape(len(text), 19)
+        shaped = (
+            (lengths == 19) & (chars[:, 4] == ord("-")) & (chars[:, 7] == ord("-"))
+            & (chars[:, 10] == ord("T")) & (chars[:, 13] == ord(":")) & (chars[:, 16] == ord(":"))
+        )
+        try:
+            seconds = raw[shaped].astype("datetime64[s]").astype(np.int64)
+        except ValueError:
+            return None, everything  # e.g. a February 30th somewhere
+        if len(seconds) and seconds.min() * 1_000_000 < _MIN_US:
+            return None, everything  # numpy has a year 0, datetime doesn't
+
+        values = np.zeros(len(text), dtype=np.int64)
+        values[shaped] = seconds * 1_000_000
+        return values.tolist(), np.flatnonzero(~shaped).tolist()
+
+    def _code(self, name: Any) -> int:
+        if not isinstance(name, str):
+            return -1
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self._names)
+            self._names.append(name)
+        return code
+
+    # -------------------------
+    # Row access
+    # -------------------------
+
+    def timestamp(self, i: int) -> Any:
+        if i in self._odd:
+            return self._odd[i]
+        return us_to_timestamp(self._ts[i])
+
+    def aspect(self, i: int) -> Optional[str]:
+        code = self._aspect[i]
+        return self._names[code] if code >= 0 else None
+
+    def entry(self, i: int) -> Entry:
+        if i in self._verbatim:
+            return Entry.from_record(self._verbatim[i])
+        return Entry(
+            self.timestamp(i),
+            self.aspect(i),
+            _value(self._aspect_level[i], MISSING_SMALL),
+            _value(self._aspect_xp[i], MISSING_XP),
+            _value(self._chain_level[i], MISSING_SMALL),
+            _value(self._chain_xp[i], MISSING_XP),
+        )
+
+    def record(self, i: int) -> Dict[str, Any]:
+        if i in self._verbatim:
+            return dict(self._verbatim[i])
+        return self.entry(i).to_record()
+
+    def iter_records(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Records for `rows` (all rows by default), built one at a time.
+        """
+        for i in range(len(self)) if rows is None else rows:
+            yield self.record(int(i))
+
+    def column(self, name: str):
+        """
+        Copy of one column as a numpy array ("timestamp" is int64 us, "aspect"
+        the int16 codes into aspect_names()). Missing values are MISSING_*.
+        """
+        return self._view("_ts" if name == "timestamp" else "_" + name).copy()
+
+    def aspect_names(self) -> List[str]:
+        return list(self._names)
+
+    def odd_timestamps(self) -> Dict[int, Any]:
+        """
+        row -> timestamp value, for rows whose timestamp isn't the int64 one.
+        """
+        return dict(self._odd)
+
+    # -------------------------
+    # Vectorized filters
+    # -------------------------
+
+    def mask(
+        self,
+        aspect: Optional[str] = None,
+        aspect_level: Optional[int] = None,
+        chain_level: Optional[int] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ):
+        """
+        Boolean numpy array of the rows matching every given filter (same
+        arguments as storage_service.filter_records(), but `start`/`end` are
+        compared as points in time, so they can be any ISO timestamp).
+        """
+        import numpy as np
+
+        keep = np.ones(len(self), dtype=bool)
+        if aspect is not None:
+            code = self._codes.get(aspect)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            keep &= self._view("_aspect") == code
+        if aspect_level is not None:
+            keep &= self._view("_aspect_level") == aspect_level
+        if chain_level is not None:
+            keep &= self._view("_chain_level") == chain_level
+        for bound, is_start in ((start, True), (end, False)):
+            if bound is None:
+                continue
+            us = timestamp_to_us(bound)
+            if us is None:
+                raise ValueError(f"bad timestamp {bound!r}")
+            ts = self._view("_ts")
+            keep &= (ts >= us) if is_start else (ts < us)
+        return keep
+
+    def select(self, **filters):
+        """
+        Row numbers matching `filters` (see mask()), oldest first.
+        """
+        if all(value is None for value in filters.values()):
+            return range(len(self))
+        import numpy as np
+
+        return np.flatnonzero(self.mask(**filters))
+
+    def take(self, rows) -> "HistoryFrame":
+        """
+        New frame with only `rows` (ascending row numbers).
+        """
+        import numpy as np
+
+        rows = np.asarray(rows, dtype=np.intp)
+        frame = HistoryFrame(self._names)
+        for attr, _, _ in _COLUMNS:
+            getattr(frame, attr).frombytes(self._view(attr)[rows].tobytes())
+        for source, target in ((self._odd, frame._odd), (self._verbatim, frame._verbatim)):
+            if not source:
+                continue
+            old = np.fromiter(source, dtype=np.intp, count=len(source))
+            new = np.searchsorted(rows, old)
+            for o, n in zip(old.tolist(), new.tolist()):
+                if n < len(rows) and rows[n] == o:
+                    target[n] = source[o]
+        return frame
+
+    def without(self, deleted: Dict[str, int]) -> "HistoryFrame":
+        """
+        Apply tombstones: drop row i if its timestamp is in `deleted` and
+        i < deleted[timestamp] (the number of rows when it was deleted).
+        Returns self if nothing matches.
+        """
+        import numpy as np
+
+        targets = {timestamp_to_us(stamp) for stamp in deleted if isinstance(stamp, str)}
+        targets.discard(None)
+        ts = self._view("_ts")
+        candidates = np.flatnonzero(np.isin(ts, np.fromiter(targets, dtype=np.int64, count=len(targets))))
+        del ts
+        candidates = set(candidates.tolist()) | set(self._odd)
+
+        drop = []
+        for i in sorted(candidates):
+            stamp = self.timestamp(i)
+            if isinstance(stamp, str) and i < deleted.get(stamp, -1):
+                drop.append(i)
+        if not drop:
+            return self
+        keep = np.ones(len(self), dtype=bool)
+        keep[drop] = False
+        return self.take(np.flatnonzero(keep))
+
+    def rows_with_timestamp(self, stamp: str) -> List[int]:
+        """
+        Row numbers whose timestamp is exactly `stamp`.
+        """
+        import numpy as np
+
+        us = timestamp_to_us(stamp) if isinstance(stamp, str) else None
+        candidates = set(self._odd)
+        if us is not None:
+            candidates.update(np.flatnonzero(self._view("_ts") == us).tolist())
+        return [i for i in sorted(candidates) if self.timestamp(i) == stamp]
+
+    def copy(self) -> "HistoryFrame":
+        frame = HistoryFrame(self._names)
+        for attr, _, _ in _COLUMNS:
+            column = getattr(self, attr)
+            setattr(frame, attr, array(column.typecode, column))
+        frame._odd = dict(self._odd)
+        frame._verbatim = dict(self._verbatim)
+        return frame
+
+    def _view(self, attr: str):
+        # Zero-copy numpy view of a column. It pins the array's buffer (an
+        # append would raise BufferError), so never keep one past the call.
+        import numpy as np
+
+        dtype = next(dtype for name, _, dtype in _COLUMNS if name == attr)
+        column = getattr(self, attr)
+        if not column:
+            return np.empty(0, dtype=dtype)
+        return np.frombuffer(column, dtype=dtype)
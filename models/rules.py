@@ -0,0 +1,108 @@
+from datetime import datetime
+from itertools import accumulate
+from typing import Any, Dict, List
+
+# What the UI lets you enter (dropdowns + QIntValidators). The importer checks
+# records against the same rules.
+ASPECTS = [
+    "Air", "Arcane", "Artisan", "Blood", "Command", "Death", "Discipline", "Earth", "Eldritch",
+    "Fire", "Fortune", "Frost", "Gadget", "Harvest", "Holy", "Lightning", "Lyric",
+    "Madness", "Poison", "Shadow", "Void", "War", "Water",
+]
+ASPECT_LEVELS = list(range(0, 16))
+CHAIN_LEVELS = list(range(0, 31))
+
+ASPECT_XP_MAX = 250_000
+CHAIN_XP_MAX = 7_500_000
+
+ASPECT_XP_BY_LEVEL = {
+    0: 500, 1: 1000, 2: 1500, 3: 2000, 4: 2500, 5: 3000, 6: 3500, 7: 4000,
+    8: 4500, 9: 5000, 10: 15000, 11: 25000, 12: 40000, 13: 120000, 14: 250000
+}
+
+CHAIN_XP_BY_LEVEL = {
+    0: 250000, 1: 500000, 2: 750000, 3: 1000000, 4: 1250000, 5: 1500000,
+    6: 1750000, 7: 2000000, 8: 2250000, 9: 2500000, 10: 2750000, 11: 3000000,
+    12: 3250000, 13: 3500000, 14: 3750000, 15: 4000000, 16: 4250000,
+    17: 4500000, 18: 4750000, 19: 5000000, 20: 5250000, 21: 5500000,
+    22: 5750000, 23: 6000000, 24: 6250000, 25: 6500000, 26: 6750000,
+    27: 7000000, 28: 7250000, 29: 7500000
+}
+
+
+def _xp_before_level(xp_by_level: Dict[int, int], levels: List[int]) -> List[int]:
+    # [0, xp(0), xp(0) + xp(1), ...]: XP earned before reaching each level
+    return [0] + list(accumulate(xp_by_level[level] for level in levels[:-1]))
+
+
+# Prefix sums of the level curves, indexed by level: lifetime XP is
+# XP_BEFORE_LEVEL[level] + xp, and the last entry is the XP of a maxed curve
+ASPECT_XP_BEFORE_LEVEL = _xp_before_level(ASPECT_XP_BY_LEVEL, ASPECT_LEVELS)
+CHAIN_XP_BEFORE_LEVEL = _xp_before_level(CHAIN_XP_BY_LEVEL, CHAIN_LEVELS)
+ASPECT_XP_TOTAL = ASPECT_XP_BEFORE_LEVEL[-1]
+CHAIN_XP_TOTAL = CHAIN_XP_BEFORE_LEVEL[-1]
+
+
+def lifetime_aspect_xp(level: int, xp: int) -> int:
+    return ASPECT_XP_BEFORE_LEVEL[level] + xp
+
+
+def lifetime_chain_xp(level: int, xp: int) -> int:
+    return CHAIN_XP_BEFORE_LEVEL[level] + xp
+
+
+FIELDS = ("timestamp", "aspect", "aspect_level", "aspect_xp", "chain_level", "chain_xp")
+
+_ASPECT_SET = frozenset(ASPECTS)
+
+
+def validate_record(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Check one record against the UI rules and return it in the shape
+    on_save_clicked() builds (int fields converted, extra keys dropped,
+    timestamp as local "YYYY-MM-DDTHH:MM:SS").
+    Raises ValueError with a short reason otherwise.
+    """
+    timestamp = raw.get("timestamp")
+    if not isinstance(timestamp, str) or not timestamp.strip():
+        raise ValueError("missing timestamp")
+    try:
+        when = datetime.fromisoformat(timestamp.strip())
+    except ValueError:
+        raise ValueError(f"bad timestamp {timestamp!r}") from None
+    if when.tzinfo is not None:
+        # The app stores naive local time
+        when = when.astimezone().replace(tzinfo=None)
+    timestamp = when.isoformat(timespec="seconds")
+
+    aspect = raw.get("aspect")
+    aspect = aspect.strip() if isinstance(aspect, str) else aspect
+    if aspect not in _ASPECT_SET:
+        raise ValueError(f"unknown aspect {aspect!r}")
+
+    return {
+        "timestamp": timestamp,
+        "aspect": aspect,
+        "aspect_level": _int_in(raw, "aspect_level", ASPECT_LEVELS[0], ASPECT_LEVELS[-1]),
+        "aspect_xp": _int_in(raw, "aspect_xp", 0, ASPECT_XP_MAX),
+        "chain_level": _int_in(raw, "chain_level", CHAIN_LEVELS[0], CHAIN_LEVELS[-1]),
+        "chain_xp": _int_in(raw, "chain_xp", 0, CHAIN_XP_MAX),
+    }
+
+
+def _int_in(raw: Dict[str, Any], key: str, low: int, high: int) -> int:
+    value = raw.get(key)
+    if isinstance(value, bool):
+        raise ValueError(f"bad {key} {value!r}")
+    if isinstance(value, str):
+        # Spreadsheets export "12,345"
+        value = value.strip().replace(",", "")
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"bad {key} {value!r}") from None
+    if isinstance(value, float) and value != number:
+        raise ValueError(f"bad {key} {value!r}")
+    if not low <= number <= high:
+        raise ValueError(f"{key} {number} out of range {low}-{high}")
+    return number
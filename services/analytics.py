@@ -0,0 +1,211 @@
+"""
+XP rate and time-to-level analytics over the indexed history.
+
+For each series (one aspect at one level, or one chain level) this keeps
+NumPy arrays of the times and a running sum of XP gained. Appends extend the
+arrays instead of rebuilding them, and every statistic is then a couple of
+binary searches and prefix-sum differences, so recomputing all 23 aspects
+after a save costs microseconds per series.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.rules import ASPECT_XP_BY_LEVEL, CHAIN_XP_BY_LEVEL
+
+HOURS_PER_DAY = 24.0
+
+
+@dataclass(frozen=True)
+class SeriesStats:
+    latest_xp: int
+    threshold: Optional[int]           # XP needed for the next level
+    xp_per_hour: Optional[float]       # over the rolling window
+    session_gain: int                  # gained since the previous session
+    eta_hours: Optional[float]         # until `threshold`, at xp_per_hour
+
+    @property
+    def remaining(self) -> Optional[int]:
+        return None if self.threshold is None else max(0, self.threshold - self.latest_xp)
+
+
+class _SeriesArrays:
+    """
+    x (days) and cumulative gain for one series. Backed by buffers with
+    spare capacity, so an append copies only the new points.
+    """
+    __slots__ = ("source", "n", "_x", "_cum", "session_start")
+
+    def __init__(self, source, xs, ys, session_gap_days):
+        self.source = source  # the index list these arrays mirror
+        self.n = 0
+        self._x = np.empty(max(len(xs), 16))
+        self._cum = np.zeros(len(self._x) + 1)  # _cum[k] = gain over points 0..k-1
+        self.session_start = 0
+        self.extend(xs, ys, session_gap_days)
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._x[:self.n]
+
+    @property
+    def cum_gain(self) -> np.ndarray:
+        return self._cum[:self.n + 1]
+
+    def extend(self, xs, ys, session_gap_days):
+        start, end = self.n, len(xs)
+        if end > len(self._x):
+            capacity = max(end, 2 * len(self._x))
+            self._x = np.resize(self._x, capacity)
+            self._cum = np.resize(self._cum, capacity + 1)
+
+        self._x[start:end] = xs[start:]
+        # Only increases count as gained XP; a drop is a correction, not play
+        prev_y = ys[start - 1] if start else ys[0]
+        gains = np.maximum(np.diff(np.asarray(ys[start:], dtype=float), prepend=prev_y), 0.0)
+        np.cumsum(gains, out=self._cum[start + 1:end + 1])
+        self._cum[start + 1:end + 1] += self._cum[start]
+        self.n = end
+
+        # Latest session = points since the last gap longer than session_gap
+        lo = max(start - 1, 0)
+        gaps = np.flatnonzero(np.diff(self._x[lo:end]) > session_gap_days)
+        if len(gaps):
+            self.session_start = lo + int(gaps[-1]) + 1
+
+
+class XpAnalytics:
+    """
+    Per-series XP/hour, last-session gain and ETA to the level threshold.
+
+    Works on anything with the HistoryIndex lookup API (the in-memory index
+    or SqliteHistoryIndex). Series arrays are cached against the index's own
+    lists: new points at the end are appended, anything else (a delete, a
+    reloaded index) rebuilds just that series.
+    """
+    def __init__(self, window_days: float = 7.0, session_gap_hours: float = 2.0):
+        self.window_days = window_days
+        self.session_gap_days = session_gap_hours / HOURS_PER_DAY
+        self._cache: Dict[Tuple, _SeriesArrays] = {}
+
+    def aspect_stats(self, index, aspect: str, level: int) -> Optional[SeriesStats]:
+        xs, ys = index.aspect_series(aspect, level)
+        return self._stats(("aspect", aspect, level), xs, ys, ASPECT_XP_BY_LEVEL.get(level))
+
+    def chain_stats(self, index, level: int) -> Optional[SeriesStats]:
+        xs, ys = index.chain_series(level)
+        return self._stats(("chain", level), xs, ys, CHAIN_XP_BY_LEVEL.get(level))
+
+    def summary(self, index) -> List[Tuple[str, int, SeriesStats]]:
+        """
+        (name, level, stats) for every aspect at its current level, then the
+        mastery chain at its current level.
+        """
+        rows = []
+        for aspect, level in sorted(index.current_aspect_levels().items()):
+            stats = self.aspect_stats(index, aspect, level)
+            if stats is not None:
+                rows.append((aspect, level, stats))
+
+        chain_level = index.current_chain_level()
+        if chain_level is not None:
+            stats = self.chain_stats(index, chain_level)
+            if stats is not None:
+                rows.append(("Mastery Chain", chain_level, stats))
+        return rows
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    # -------------------------
+    # Internals
+    # -------------------------
+
+    def _arrays(self, key, xs, ys) -> _SeriesArrays:
+        arrays = self._cache.get(key)
+        if (
+            arrays is not None
+            and arrays.source is xs
+            and arrays.n <= len(xs)
+            and (arrays.n == 0 or xs[arrays.n - 1] == arrays.x[-1])
+        ):
+            if arrays.n < len(xs):
+                arrays.extend(xs, ys, self.session_gap_days)
+            return arrays
+
+        arrays = _SeriesArrays(xs, xs, ys, self.session_gap_days)
+        self._cache[key] = arrays
+        return arrays
+
+    def _stats(self, key, xs, ys, threshold) -> Optional[SeriesStats]:
+        if not xs:
+            self._cache.pop(key, None)
+            return None
+
+        a = self._arrays(key, xs, ys)
+        x, cum = a.x, a.cum_gain
+        last = a.n - 1
+        latest = int(ys[-1])
+
+        # Rolling rate: XP gained between the first point inside the window
+        # and the newest point, over the time between them
+        first = int(np.searchsorted(x, x[last] - self.window_days, side="left"))
+        hours = (x[last] - x[first]) * HOURS_PER_DAY
+        rate = float(cum[last + 1] - cum[first + 1]) / hours if hours > 0 else None
+
+        # Gain since the end of the previous session (or within the only one)
+        s = a.session_start
+        session_gain = int(cum[last + 1] - cum[s if s > 0 else 1])
+
+        eta = None
+        if threshold:
+            remaining = threshold - latest
+            if remaining <= 0:
+                eta = 0.0
+            elif rate:
+                eta = remaining / rate
+
+        return SeriesStats(latest, threshold or None, rate, session_gain, eta)
+
+
+def lifetime_series(series_by_level, xp_before_level) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge per-level series ({level: (xs, ys)}) into one time-ordered series
+    of lifetime XP, using the level curve's prefix sums
+    (models.rules.*_XP_BEFORE_LEVEL): one offset add per level, one sort.
+    """
+    offsets = np.asarray(xp_before_level, dtype=np.int64)
+    parts = [(level, xs, ys) for level, (xs, ys) in series_by_level.items() if len(xs)]
+    if not parts:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+
+    x = np.concatenate([np.asarray(xs, dtype=float) for _, xs, _ in parts])
+    y = np.concatenate([np.asarray(ys, dtype=np.int64) for _, _, ys in parts])
+    levels = np.repeat([level for level, _, _ in parts], [len(xs) for _, xs, _ in parts])
+    y += offsets[levels]
+
+    order = np.argsort(x, kind="stable")
+    return x[order], y[order]
+
+
+def format_rate(rate: Optional[float]) -> str:
+    return "—" if not rate else f"{rate:,.0f}/h"
+
+
+def format_eta(hours: Optional[float]) -> str:
+    """
+    0 -> "ready", 3.4 -> "3h 24m", 52 -> "2d 4h".
+    """
+    if hours is None or not math.isfinite(hours):
+        return "—"
+    if hours <= 0:
+        return "ready"
+    minutes = int(round(hours * 60))
+    if minutes < 60:
+        return f"{max(minutes, 1)}m"
+    if minutes < 48 * 60:
+        return f"{minutes // 60}h {minutes % 60:02d}m"
+    days, rem = divmod(minutes // 60, 24)
+    return f"{days}d {rem}h"
@@ -0,0 +1,92 @@
+"""
+Streaming export of XP history to CSV or JSON Lines.
+
+A generator pipeline: storage.iter_records() (filtered) -> project() ->
+writer. Records are written as they are read, so output starts at once and
+memory stays flat however large the history is.
+"""
+import csv
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence
+
+from models.rules import FIELDS
+
+FORMATS = ("csv", "jsonl")
+PROGRESS_EVERY = 10_000
+
+_SUFFIXES = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def detect_format(path: Path) -> str:
+    fmt = _SUFFIXES.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Can't tell the format of {Path(path).name}; pass one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def project(records: Iterable[Dict[str, Any]], fields: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily cut each record down to `fields` (missing ones become None).
+    """
+    for r in records:
+        yield {name: r.get(name) for name in fields}
+
+
+def write_csv(records: Iterable[Dict[str, Any]], f, fields: Sequence[str] = FIELDS) -> int:
+    writer = csv.DictWriter(f, fieldnames=list(fields), extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for r in records:
+        writer.writerow(r)
+        count += 1
+    return count
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], f) -> int:
+    count = 0
+    for r in records:
+        f.write(json.dumps(r, separators=(",", ":")) + "\n")
+        count += 1
+    return count
+
+
+def export_records(
+    storage,
+    out,
+    fmt: Optional[str] = None,
+    fields: Sequence[str] = FIELDS,
+    progress: Optional[Callable[[int], None]] = None,
+    **filters,
+) -> int:
+    """
+    Write the records matching `filters` (see StorageService.iter_records)
+    to `out`, a path or an open text file. Returns the number written.
+    `progress` gets the running count every PROGRESS_EVERY records.
+    """
+    records = project(storage.iter_records(**filters), fields)
+    if progress is not None:
+        records = _report_progress(records, progress)
+
+    if isinstance(out, (str, Path)):
+        fmt = fmt or detect_format(Path(out))
+        with open(out, "w", encoding="utf-8", newline="") as f:
+            return _write(records, f, fmt, fields)
+    return _write(records, out, fmt or "jsonl", fields)
+
+
+def _write(records, f, fmt: str, fields: Sequence[str]) -> int:
+    if fmt == "csv":
+        return write_csv(records, f, fields)
+    if fmt == "jsonl":
+        return write_jsonl(records, f)
+    raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def _report_progress(records: Iterable[Dict[str, Any]], progress: Callable[[int], None]) -> Iterator[Dict[str, Any]]:
+    count = 0
+    for r in records:
+        yield r
+        count += 1
+        if count % PROGRESS_EVERY == 0:
+            progress(count)
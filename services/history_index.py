@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.timestamps import US_PER_DAY, round_trips, timestamp_to_days
+
+
+class Series:
+    """
+    One time-ordered series: parallel typed arrays of times (matplotlib date
+    numbers, parsed once when the record is indexed), XP values and stamp
+    tags (used to find points again on delete). Tag 0 means the timestamp
+    string is the canonical rendering of the time; others index the
+    HistoryIndex's table of odd stamps.
+    """
+    __slots__ = ("xs", "ys", "tags")
+
+    def __init__(self, xs=None, ys=None, tags=None):
+        self.xs = array("d") if xs is None else xs
+        self.ys = array("q") if ys is None else ys
+        self.tags = array("i") if tags is None else tags
+
+    def add(self, dt: float, xp: int, tag: int) -> int:
+        # New entries are almost always the newest, so this is an append.
+        i = bisect_right(self.xs, dt)
+        self.xs.insert(i, dt)
+        self.ys.insert(i, xp)
+        self.tags.insert(i, tag)
+        return i
+
+    def remove(self, dt: float, tag: int) -> bool:
+        removed = False
+        i = bisect_left(self.xs, dt)
+        while i < len(self.xs) and self.xs[i] == dt:
+            if self.tags[i] == tag:
+                del self.xs[i]
+                del self.ys[i]
+                del self.tags[i]
+                removed = True
+            else:
+                i += 1
+        return removed
+
+    def latest(self) -> Optional[int]:
+        return self.ys[-1] if self.ys else None
+
+
+class HistoryIndex:
+    """
+    Secondary indexes over the history records:
+      - (aspect, aspect_level) -> aspect XP series
+      - chain_level            -> chain XP series
+
+    Both are kept sorted by timestamp and updated incrementally, so the
+    controller can look up a series without scanning, parsing or re-sorting
+    history. x values are matplotlib date numbers (see utils.timestamps).
+    Returned arrays (array.array, "d" and "q") are shared with the index;
+    treat them as read-only.
+
+    Optionally carries services.rollups.Rollups (see attach_rollups()), which
+    are then kept current on every add/remove too.
+    """
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        self._aspect: Dict[Tuple[str, int], Series] = {}
+        self._chain: Dict[int, Series] = {}
+        # Timestamp strings that don't round-trip; tag = position + 1
+        self._odd_stamps: List[str] = []
+        self._odd_tags: Dict[str, int] = {}
+        self.rollups = None
+        for record in records:
+            self.add(record)
+
+    @classmethod
+    def from_frame(cls, frame) -> "HistoryIndex":
+        """
+        Build the index from a models.entry.HistoryFrame in a few vectorized
+        passes (same result as adding its records one by one).
+        """
+        import numpy as np
+        from models.entry import MISSING_SMALL, MISSING_TS, MISSING_XP
+
+        index = cls()
+        ts = frame.column("timestamp")
+        tags = np.zeros(len(frame), dtype=np.int32)
+        for row, stamp in frame.odd_timestamps().items():
+            if ts[row] != MISSING_TS:
+                tags[row] = index._tag(stamp)
+        days = ts / US_PER_DAY
+        dated = ts != MISSING_TS
+
+        names = frame.aspect_names()
+        codes = frame.column("aspect")
+        levels = frame.column("aspect_level")
+        xp = frame.column("aspect_xp")
+        rows = np.flatnonzero(dated & (codes >= 0) & (levels != MISSING_SMALL) & (xp != MISSING_XP))
+        for (code, level), group in _groups(rows, ts, codes, levels):
+            index._aspect[(names[code], level)] = _series(days, xp, tags, group)
+
+        levels = frame.column("chain_level")
+        xp = frame.column("chain_xp")
+        rows = np.flatnonzero(dated & (levels != MISSING_SMALL) & (xp != MISSING_XP))
+        for (level,), group in _groups(rows, ts, levels):
+            index._chain[level] = _series(days, xp, tags, group)
+        return index
+
+    # -------------------------
+    # Updates
+    # -------------------------
+
+    def add(self, record: Dict[str, Any]) -> None:
+        stamp = record.get("timestamp", "")
+        dt = timestamp_to_days(stamp)
+        if dt is None:
+            return
+        tag = self._tag(stamp)
+
+        aspect = record.get("aspect")
+        level = record.get("aspect_level")
+        axp = record.get("aspect_xp")
+        if aspect is not None and level is not None and axp is not None:
+            series = self._aspect.setdefault((aspect, level), Series())
+            i = series.add(dt, int(axp), tag)
+            if self.rollups is not None:
+                self.rollups.point_added(("aspect", aspect, level), series.xs, series.ys, i)
+
+        chain_level = record.get("chain_level")
+        cxp = record.get("chain_xp")
+        if chain_level is not None and cxp is not None:
+            series = self._chain.setdefault(chain_level, Series())
+            i = series.add(dt, int(cxp), tag)
+            if self.rollups is not None:
+                self.rollups.point_added(("chain", chain_level), series.xs, series.ys, i)
+
+    def remove(self, record: Dict[str, Any]) -> None:
+        stamp = record.get("timestamp", "")
+        dt = timestamp_to_days(stamp)
+        tag = None if dt is None else self._tag(stamp, create=False)
+        if tag is None:
+            return
+
+        key = (record.get("aspect"), record.get("aspect_level"))
+        series = self._aspect.get(key)
+        if series is not None and series.remove(dt, tag):
+            self._removed(("aspect", *key), series, dt)
+
+        series = self._chain.get(record.get("chain_level"))
+        if series is not None and series.remove(dt, tag):
+            self._removed(("chain", record.get("chain_level")), series, dt)
+
+    def remove_timestamp(self, stamp: str) -> None:
+        """
+        Drop every point with this timestamp. Costs a binary search per
+        series, independent of how much history there is.
+        """
+        dt = timestamp_to_days(stamp)
+        tag = None if dt is None else self._tag(stamp, create=False)
+        if tag is None:
+            return
+        for key, series in self._aspect.items():
+            if series.remove(dt, tag):
+                self._removed(("aspect", *key), series, dt)
+        for level, series in self._chain.items():
+            if series.remove(dt, tag):
+                self._removed(("chain", level), series, dt)
+
+    def _tag(self, stamp: str, create: bool = True) -> Optional[int]:
+        # Only called for parseable stamps. None: an odd stamp never indexed.
+        if round_trips(stamp):
+            return 0
+        tag = self._odd_tags.get(stamp)
+        if tag is None and create:
+            self._odd_stamps.append(stamp)
+            tag = self._odd_tags[stamp] = len(self._odd_stamps)
+        return tag
+
+    def _removed(self, key: Tuple, series: Series, dt: float) -> None:
+        if self.rollups is not None:
+            self.rollups.point_removed(key, series.xs, series.ys, dt)
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+
+    def aspect_series(self, aspect: str, level: int) -> Tuple[array, array]:
+        series = self._aspect.get((aspect, level))
+        return (series.xs, series.ys) if series else (array("d"), array("q"))
+
+    def chain_series(self, level: int) -> Tuple[array, array]:
+        series = self._chain.get(level)
+        return (series.xs, series.ys) if series else (array("d"), array("q"))
+
+    def aspect_series_by_level(self, aspect: str) -> Dict[int, Tuple[array, array]]:
+        """
+        level -> series, for every level of `aspect` with data.
+        """
+        return {
+            level: (series.xs, series.ys)
+            for (name, level), series in self._aspect.items()
+            if name == aspect and series.xs
+        }
+
+    def chain_series_by_level(self) -> Dict[int, Tuple[array, array]]:
+        return {level: (series.xs, series.ys) for level, series in self._chain.items() if series.xs}
+
+    def aspect_rollup(self, aspect: str, level: int, period: str):
+        """
+        Buckets of one aspect series (needs attach_rollups()).
+        """
+        xs, ys = self.aspect_series(aspect, level)
+        return self.rollups.get(("aspect", aspect, level), period, xs, ys)
+
+    def chain_rollup(self, level: int, period: str):
+        xs, ys = self.chain_series(level)
+        return self.rollups.get(("chain", level), period, xs, ys)
+
+    def attach_rollups(self, rollups) -> None:
+        """
+        Start maintaining `rollups` (services.rollups.Rollups, fresh or loaded
+        from a sidecar that matches this index's history).
+        """
+        self.rollups = rollups
+
+    def latest_aspect_xp(self, aspect: str, level: int) -> Optional[int]:
+        series = self._aspect.get((aspect, level))
+        return series.latest() if series else None
+
+    def latest_chain_xp(self, level: int) -> Optional[int]:
+        series = self._chain.get(level)
+        return series.latest() if series else None
+
+    def current_aspect_levels(self) -> Dict[str, int]:
+        """
+        aspect -> level of its most recent entry.
+        """
+        newest: Dict[str, Tuple[float, int]] = {}
+        for (aspect, level), series in self._aspect.items():
+            if series.xs and (aspect not in newest or series.xs[-1] > newest[aspect][0]):
+                newest[aspect] = (series.xs[-1], level)
+        return {aspect: level for aspect, (_, level) in newest.items()}
+
+    def current_chain_level(self) -> Optional[int]:
+        newest = None
+        for level, series in self._chain.items():
+            if series.xs and (newest is None or series.xs[-1] > newest[0]):
+                newest = (series.xs[-1], level)
+        return newest[1] if newest else None
+
+
+def _groups(rows, ts, *keys):
+    # Split `rows` into runs with equal keys, each ordered by time; equal
+    # times keep row order, like repeated Series.add() calls
+    import numpy as np
+
+    if not len(rows):
+        return
+    columns = [key[rows] for key in keys]
+    order = rows[np.lexsort([ts[rows]] + columns[::-1])]
+    sorted_keys = [key[order] for key in keys]
+    change = np.zeros(len(order), dtype=bool)
+    change[0] = True
+    for column in sorted_keys:
+        change[1:] |= column[1:] != column[:-1]
+    heads = np.flatnonzero(change).tolist() + [len(order)]
+    for lo, hi in zip(heads, heads[1:]):
+        yield tuple(int(column[lo]) for column in sorted_keys), order[lo:hi]
+
+
+def _series(days, xp, tags, rows) -> Series:
+    return Series(
+        array("d", days[rows].tobytes()),
+        array("q", xp[rows].tobytes()),
+        array("i", tags[rows].tobytes()),
+    )
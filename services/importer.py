@@ -0,0 +1,143 @@
+"""
+Streaming bulk import of XP history from CSV, JSON (one list) or JSON Lines.
+
+Rows are read one at a time, checked with models.rules.validate_record (the
+same rules the UI enforces) and handed to the storage in batches through
+append_records(), so memory stays bounded by the batch size, not the file.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from models.rules import validate_record
+from services.storage_service import iter_json_list
+
+FORMATS = ("csv", "json", "jsonl")
+MAX_ERRORS_KEPT = 20
+
+_SUFFIXES = {".csv": "csv", ".json": "json", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    imported: int = 0
+    rejected: int = 0
+    bytes_read: int = 0
+    bytes_total: int = 0
+    # (row number, reason) for the first MAX_ERRORS_KEPT rejected rows
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def fraction(self) -> float:
+        return self.bytes_read / self.bytes_total if self.bytes_total else 1.0
+
+
+def detect_format(path: Path) -> str:
+    fmt = _SUFFIXES.get(path.suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Can't tell the format of {path.name}; pass one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def import_file(
+    storage,
+    path: Path,
+    fmt: Optional[str] = None,
+    batch_size: int = 5000,
+    progress: Optional[Callable[[ImportResult], None]] = None,
+) -> ImportResult:
+    """
+    Validate and append every row of `path` to `storage`.
+    `progress` is called after each batch is written.
+    """
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    result = ImportResult(bytes_total=path.stat().st_size)
+    batch: List[Dict[str, Any]] = []
+
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row_number, raw in enumerate(iter_rows(f, fmt), start=1):
+            result.rows = row_number
+            try:
+                batch.append(_check(raw))
+            except ValueError as e:
+                result.rejected += 1
+                if len(result.errors) < MAX_ERRORS_KEPT:
+                    result.errors.append((row_number, str(e)))
+
+            if len(batch) >= batch_size:
+                _write_batch(storage, batch, result, f, progress)
+                batch = []
+
+        _write_batch(storage, batch, result, f, progress)
+
+    return result
+
+
+def iter_rows(f, fmt: str) -> Iterator[Any]:
+    """
+    Raw rows from an open text file, one at a time.
+    """
+    if fmt == "csv":
+        return _iter_csv(f)
+    if fmt == "json":
+        return iter_json_list(f)
+    if fmt == "jsonl":
+        return _iter_jsonl(f)
+    raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+# -------------------------
+# Readers
+# -------------------------
+
+def _iter_csv(f) -> Iterator[Dict[str, Any]]:
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if header is None:
+        return
+    # "Aspect XP" (the table header) and "aspect_xp" both work
+    keys = [h.strip().lower().replace(" ", "_") for h in header]
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        yield dict(zip(keys, values))
+
+
+def _iter_jsonl(f) -> Iterator[Any]:
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            yield _Unreadable(f"invalid JSON: {e.msg}")
+
+
+class _Unreadable:
+    # Stands in for a line that wasn't valid JSON, so it is counted and reported
+    def __init__(self, reason: str):
+        self.reason = reason
+
+
+def _check(raw: Any) -> Dict[str, Any]:
+    if isinstance(raw, _Unreadable):
+        raise ValueError(raw.reason)
+    if not isinstance(raw, dict):
+        raise ValueError("not an object")
+    if "op" in raw:
+        raise ValueError("journal delete marker (compact the journal before importing it)")
+    return validate_record(raw)
+
+
+def _write_batch(storage, batch, result: ImportResult, f, progress) -> None:
+    if batch:
+        storage.append_records(batch)
+        result.imported += len(batch)
+    result.bytes_read = f.buffer.tell()
+    if progress is not None:
+        progress(result)
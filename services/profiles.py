@@ -0,0 +1,115 @@
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Optional
+
+from services.storage_service import StorageConfig, open_storage
+
+DEFAULT_PROFILE = "Default"
+PROFILES_DIRNAME = "profiles"
+ACTIVE_FILENAME = "active_profile"
+
+_UNSAFE = re.compile(r"[^\w \-]+")
+
+
+class ProfileManager:
+    """
+    One history shard per character.
+
+    "Default" is the history already in `data_dir`; every other profile gets
+    its own directory under data_dir/profiles/ with the same file layout.
+    Listing profiles only looks at directory names. A profile's storage is
+    opened (and its history parsed) the first time it is asked for, and at
+    most `max_loaded` stay in memory: the least recently used one is closed
+    (flushing any write-behind queue) when another one is needed.
+    """
+    def __init__(self, config: StorageConfig, max_loaded: int = 3):
+        self._config = config
+        self._max_loaded = max(1, max_loaded)
+        self._lock = threading.Lock()
+        self._open = OrderedDict()  # name -> storage, least recently used first
+
+    @property
+    def root(self) -> Path:
+        return self._config.data_dir / PROFILES_DIRNAME
+
+    def list_profiles(self) -> List[str]:
+        names = []
+        if self.root.is_dir():
+            names = sorted((p.name for p in self.root.iterdir() if p.is_dir()), key=str.lower)
+        return [DEFAULT_PROFILE] + [n for n in names if n != DEFAULT_PROFILE]
+
+    def create(self, name: str) -> str:
+        """
+        Make an (empty) profile and return its name as stored on disk.
+        """
+        name = clean_profile_name(name)
+        if name != DEFAULT_PROFILE:
+            self._shard_dir(name).mkdir(parents=True, exist_ok=True)
+        return name
+
+    def get(self, name: str):
+        """
+        Storage for profile `name`, opening it if needed (LRU).
+        """
+        name = clean_profile_name(name)
+        with self._lock:
+            storage = self._open.get(name)
+            if storage is not None:
+                self._open.move_to_end(name)
+                return storage
+
+            storage = open_storage(replace(self._config, data_dir=self._shard_dir(name)))
+            self._open[name] = storage
+            evicted = []
+            while len(self._open) > self._max_loaded:
+                evicted.append(self._open.popitem(last=False)[1])
+
+        for old in evicted:
+            old.close()
+        return storage
+
+    def loaded_profiles(self) -> List[str]:
+        with self._lock:
+            return list(self._open)
+
+    def close_all(self) -> None:
+        with self._lock:
+            storages = list(self._open.values())
+            self._open.clear()
+        for storage in storages:
+            storage.close()
+
+    # -------------------------
+    # Last used profile
+    # -------------------------
+
+    def last_active(self) -> str:
+        path = self._config.data_dir / ACTIVE_FILENAME
+        try:
+            name = path.read_text(encoding="utf-8").strip()
+        except OSError:
+            return DEFAULT_PROFILE
+        return name if name in self.list_profiles() else DEFAULT_PROFILE
+
+    def remember_active(self, name: str) -> None:
+        self._config.data_dir.mkdir(parents=True, exist_ok=True)
+        (self._config.data_dir / ACTIVE_FILENAME).write_text(name, encoding="utf-8")
+
+    def _shard_dir(self, name: str) -> Path:
+        if name == DEFAULT_PROFILE:
+            return self._config.data_dir
+        return self.root / name
+
+
+def clean_profile_name(name: Optional[str]) -> str:
+    """
+    Profile names double as directory names: keep letters, digits, spaces,
+    "-" and "_".
+    """
+    name = _UNSAFE.sub("", (name or "").strip()).strip()
+    if not name:
+        raise ValueError("Profile name can't be empty")
+    return name
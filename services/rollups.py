@@ -0,0 +1,222 @@
+"""
+Daily and weekly rollups of the indexed XP series.
+
+A rollup holds one row per time bucket a series has entries in: bucket
+start, first/last/max XP, XP gained and entry count. Rollups are built on
+first use (vectorized, from the HistoryIndex lists) and then kept current by
+HistoryIndex on every add/remove: an append updates the newest bucket in
+place, anything else recomputes only the buckets it touched. Long-range
+views read a few hundred buckets instead of every raw point.
+
+Gain follows services.analytics: the sum of increases between consecutive
+points, counted in the bucket of the later point (drops are corrections).
+"""
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Bucket width and alignment, in days (x values are days since 1970-01-01,
+# a Thursday; weeks start on Mondays, so they're aligned to 1970-01-05)
+PERIODS = {"day": (1.0, 0.0), "week": (7.0, 4.0)}
+
+SIDECAR_VERSION = 1
+
+_FIELDS = ("start", "first", "last", "max", "gain", "count")
+
+
+class SeriesRollup:
+    """
+    Buckets of one series at one period, as parallel lists (oldest first).
+    """
+    __slots__ = ("width", "origin", "start", "first", "last", "max", "gain", "count")
+
+    def __init__(self, period: str):
+        self.width, self.origin = PERIODS[period]
+        for name in _FIELDS:
+            setattr(self, name, [])
+
+    @classmethod
+    def build(cls, period: str, xs, ys) -> "SeriesRollup":
+        rollup = cls(period)
+        n = len(xs)
+        if n == 0:
+            return rollup
+
+        x = np.asarray(xs, dtype=float)
+        y = np.asarray(ys, dtype=np.int64)
+        starts = rollup._starts(x)
+        # x is sorted, so each bucket is one contiguous run
+        heads = np.flatnonzero(np.concatenate(([True], starts[1:] != starts[:-1])))
+        tails = np.append(heads[1:] - 1, n - 1)
+        gains = np.maximum(np.diff(y, prepend=y[0]), 0)
+
+        rollup.start = starts[heads].tolist()
+        rollup.first = y[heads].tolist()
+        rollup.last = y[tails].tolist()
+        rollup.max = np.maximum.reduceat(y, heads).tolist()
+        rollup.gain = np.add.reduceat(gains, heads).tolist()
+        rollup.count = (tails - heads + 1).tolist()
+        return rollup
+
+    def __len__(self):
+        return len(self.start)
+
+    def bucket_start(self, x: float) -> float:
+        # Same arithmetic as _starts(), so both agree on bucket edges
+        return math.floor((x - self.origin) / self.width) * self.width + self.origin
+
+    def as_dict(self) -> Dict[str, List]:
+        """
+        Copy of the columns (safe to hand to another thread).
+        """
+        return {name: list(getattr(self, name)) for name in _FIELDS}
+
+    @classmethod
+    def from_dict(cls, period: str, data: Dict[str, List]) -> "SeriesRollup":
+        rollup = cls(period)
+        for name in _FIELDS:
+            setattr(rollup, name, list(data[name]))
+        if len({len(getattr(rollup, name)) for name in _FIELDS}) != 1:
+            raise ValueError("ragged rollup columns")
+        return rollup
+
+    # -------------------------
+    # Updates (called by HistoryIndex)
+    # -------------------------
+
+    def point_added(self, xs, ys, i: int) -> None:
+        """
+        The series got a new point at position i.
+        """
+        if i == len(xs) - 1 and self.start and self.bucket_start(xs[i]) == self.start[-1]:
+            # The common case: a newer entry in the current bucket
+            y = ys[i]
+            self.last[-1] = y
+            self.max[-1] = max(self.max[-1], y)
+            self.gain[-1] += max(0, y - ys[i - 1])
+            self.count[-1] += 1
+            return
+
+        # Its own bucket, and the next point's (whose gain now starts here)
+        self.refresh(xs, ys, xs[i])
+        if i + 1 < len(xs):
+            self.refresh(xs, ys, xs[i + 1])
+
+    def point_removed(self, xs, ys, x: float) -> None:
+        """
+        Points at time x were removed from the series.
+        """
+        self.refresh(xs, ys, x)
+        i = bisect_right(xs, x)
+        if i < len(xs):
+            self.refresh(xs, ys, xs[i])
+
+    def refresh(self, xs, ys, x: float) -> None:
+        """
+        Recompute the bucket containing time x from the series.
+        """
+        start = self.bucket_start(x)
+        lo = bisect_left(xs, start)
+        hi = bisect_left(xs, start + self.width)
+        b = bisect_left(self.start, start)
+        exists = b < len(self.start) and self.start[b] == start
+
+        if lo == hi:
+            if exists:
+                for name in _FIELDS:
+                    del getattr(self, name)[b]
+            return
+
+        ys_in = ys[lo:hi]
+        prev = ys[lo - 1] if lo else ys_in[0]
+        gain = 0
+        for y in ys_in:
+            gain += max(0, y - prev)
+            prev = y
+        row = (start, ys_in[0], ys_in[-1], max(ys_in), gain, hi - lo)
+
+        for name, value in zip(_FIELDS, row):
+            column = getattr(self, name)
+            if exists:
+                column[b] = value
+            else:
+                column.insert(b, value)
+
+    def _starts(self, x: np.ndarray) -> np.ndarray:
+        return np.floor((x - self.origin) / self.width) * self.width + self.origin
+
+
+class Rollups:
+    """
+    Lazily built SeriesRollups for the series of one HistoryIndex, keyed by
+    ("aspect", aspect, level) / ("chain", level) and period.
+    """
+    def __init__(self):
+        self._built: Dict[Tuple[Tuple, str], SeriesRollup] = {}
+
+    def get(self, key: Tuple, period: str, xs, ys) -> SeriesRollup:
+        rollup = self._built.get((key, period))
+        if rollup is None:
+            rollup = self._built[(key, period)] = SeriesRollup.build(period, xs, ys)
+        return rollup
+
+    def point_added(self, key: Tuple, xs, ys, i: int) -> None:
+        for period in PERIODS:
+            rollup = self._built.get((key, period))
+            if rollup is not None:
+                rollup.point_added(xs, ys, i)
+
+    def point_removed(self, key: Tuple, xs, ys, x: float) -> None:
+        for period in PERIODS:
+            rollup = self._built.get((key, period))
+            if rollup is not None:
+                rollup.point_removed(xs, ys, x)
+
+    def __len__(self):
+        return len(self._built)
+
+    # -------------------------
+    # Sidecar cache
+    # -------------------------
+
+    def save(self, path, signature) -> None:
+        """
+        Write the built rollups next to the history, tagged with the history
+        file's signature. Atomic replace, like journal compaction.
+        """
+        data = {
+            "version": SIDECAR_VERSION,
+            "signature": list(signature),
+            "series": [
+                {"key": list(key), "period": period, **rollup.as_dict()}
+                for (key, period), rollup in self._built.items()
+            ],
+        }
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, signature) -> Optional["Rollups"]:
+        """
+        Rollups saved by save(), or None if the file is missing, unreadable
+        or was written for a different version of the history file.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != SIDECAR_VERSION or data.get("signature") != list(signature):
+                return None
+            rollups = cls()
+            for item in data["series"]:
+                key = tuple(item["key"])
+                rollups._built[(key, item["period"])] = SeriesRollup.from_dict(item["period"], item)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return rollups
+
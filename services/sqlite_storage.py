@@ -0,0 +1,391 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models.entry import HistoryFrame
+from services.storage_service import StorageConfig, read_journal, read_json_list
+from utils.timestamps import timestamp_to_days
+
+COLUMNS = ("timestamp", "aspect", "aspect_level", "aspect_xp", "chain_level", "chain_xp")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id           INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp    TEXT NOT NULL,
+    aspect       TEXT,
+    aspect_level INTEGER,
+    aspect_xp    INTEGER,
+    chain_level  INTEGER,
+    chain_xp     INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_history_aspect ON history (aspect, aspect_level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_chain ON history (chain_level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp);
+"""
+
+
+class SqliteStorageService:
+    """
+    SQLite storage with the same public API as StorageService.
+
+    Appends and deletes are single indexed statements, and per-series reads
+    go through the (aspect, aspect_level, timestamp) / (chain_level, timestamp)
+    indexes instead of loading the whole history. The database runs in WAL
+    mode so readers don't block the writer.
+    """
+    def __init__(self, config: StorageConfig):
+        self._config = config
+        self._config.data_dir.mkdir(parents=True, exist_ok=True)
+
+        is_new = not config.db_path.exists()
+
+        # One shared connection; the lock makes it safe to use from workers
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(config.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._data_version = self._read_data_version()
+
+        if is_new:
+            self._import_legacy()
+
+    # -------------------------
+    # Public API (same as StorageService)
+    # -------------------------
+
+    def load_history(self) -> List[Dict[str, Any]]:
+        """
+        Load and return all saved records, in insertion order.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM history ORDER BY id"
+            ).fetchall()
+            self._data_version = self._read_data_version()
+        return [dict(row) for row in rows]
+
+    def load_frame(self) -> HistoryFrame:
+        """
+        The history as a HistoryFrame, in insertion order.
+        """
+        with self._lock:
+            cursor = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM history ORDER BY id")
+            self._data_version = self._read_data_version()
+            frame = HistoryFrame()
+            while True:
+                rows = cursor.fetchmany(5000)
+                if not rows:
+                    return frame
+                frame.extend(dict(row) for row in rows)
+
+    def append_record(self, record: Dict[str, Any]) -> None:
+        """
+        Append a single record to history and persist it.
+        """
+        with self._lock, self._conn:
+            self._insert(record)
+
+    def append_records(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Append several records in one transaction (bulk import).
+        """
+        with self._lock, self._conn:
+            self._insert_many(records)
+
+    def save_history(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Replace the entire history in one transaction.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+            self._insert_many(records)
+
+    def delete_record(self, timestamp: str) -> None:
+        """
+        Remove every record with the given timestamp (indexed).
+        """
+        if not timestamp:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history WHERE timestamp = ?", (timestamp,))
+
+    def compact(self) -> bool:
+        """
+        Fold the WAL back into the main database file.
+        """
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return False
+
+    def needs_compaction(self) -> bool:
+        return False
+
+    def compact_if_needed(self) -> bool:
+        return False
+
+    def flush(self) -> None:
+        # Every write commits immediately; nothing is queued
+        pass
+
+    def history_index(self) -> "SqliteHistoryIndex":
+        """
+        Per-series lookups answered by indexed queries (HistoryIndex API).
+        """
+        return SqliteHistoryIndex(self)
+
+    def clear_history(self) -> None:
+        """
+        Remove all records; the database file itself is kept.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM history")
+
+    def file_exists(self) -> bool:
+        return self._config.db_path.exists()
+
+    @property
+    def data_path(self) -> Path:
+        return self._config.db_path
+
+    def is_stale(self) -> bool:
+        """
+        True if another connection committed since we last read.
+        """
+        with self._lock:
+            return self._read_data_version() != self._data_version
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------
+    # Filtered queries
+    # -------------------------
+
+    def iter_records(
+        self,
+        aspect: Optional[str] = None,
+        aspect_level: Optional[int] = None,
+        chain_level: Optional[int] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching records in timestamp order. `start`/`end` are ISO
+        timestamps (inclusive / exclusive).
+        """
+        clauses, params = [], []
+        for column, value in (("aspect", aspect), ("aspect_level", aspect_level), ("chain_level", chain_level)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(end)
+
+        sql = f"SELECT {', '.join(COLUMNS)} FROM history"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp, id"
+
+        # Stream in batches; the lock is only held while fetching
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(500)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+
+    def aspect_series(self, aspect: str, level: int) -> Tuple[List[float], List[int]]:
+        return self._series(
+            "SELECT timestamp, aspect_xp FROM history "
+            "WHERE aspect = ? AND aspect_level = ? AND aspect_xp IS NOT NULL "
+            "ORDER BY timestamp, id",
+            (aspect, level),
+        )
+
+    def chain_series(self, level: int) -> Tuple[List[float], List[int]]:
+        return self._series(
+            "SELECT timestamp, chain_xp FROM history "
+            "WHERE chain_level = ? AND chain_xp IS NOT NULL "
+            "ORDER BY timestamp, id",
+            (level,),
+        )
+
+    def aspect_series_by_level(self, aspect: str) -> Dict[int, Tuple[List[float], List[int]]]:
+        return self._series_by_level(
+            "SELECT aspect_level, timestamp, aspect_xp FROM history "
+            "WHERE aspect = ? AND aspect_level IS NOT NULL AND aspect_xp IS NOT NULL "
+            "ORDER BY aspect_level, timestamp, id",
+            (aspect,),
+        )
+
+    def chain_series_by_level(self) -> Dict[int, Tuple[List[float], List[int]]]:
+        return self._series_by_level(
+            "SELECT chain_level, timestamp, chain_xp FROM history "
+            "WHERE chain_level IS NOT NULL AND chain_xp IS NOT NULL "
+            "ORDER BY chain_level, timestamp, id",
+            (),
+        )
+
+    def aspect_rollup(self, aspect: str, level: int, period: str) -> Dict[str, List]:
+        from services.rollups import SeriesRollup
+        return SeriesRollup.build(period, *self.aspect_series(aspect, level)).as_dict()
+
+    def chain_rollup(self, level: int, period: str) -> Dict[str, List]:
+        from services.rollups import SeriesRollup
+        return SeriesRollup.build(period, *self.chain_series(level)).as_dict()
+
+    def latest_aspect_xp(self, aspect: str, level: int) -> Optional[int]:
+        return self._scalar(
+            "SELECT aspect_xp FROM history WHERE aspect = ? AND aspect_level = ? "
+            "AND aspect_xp IS NOT NULL ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (aspect, level),
+        )
+
+    def latest_chain_xp(self, level: int) -> Optional[int]:
+        return self._scalar(
+            "SELECT chain_xp FROM history WHERE chain_level = ? "
+            "AND chain_xp IS NOT NULL ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (level,),
+        )
+
+    def current_aspect_levels(self) -> Dict[str, int]:
+        """
+        aspect -> level of its most recent entry.
+        """
+        with self._lock:
+            # SQLite takes the bare columns from the MAX() row
+            rows = self._conn.execute(
+                "SELECT aspect, aspect_level, MAX(timestamp) FROM history "
+                "WHERE aspect IS NOT NULL AND aspect_level IS NOT NULL GROUP BY aspect"
+            ).fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def current_chain_level(self) -> Optional[int]:
+        return self._scalar(
+            "SELECT chain_level FROM history WHERE chain_level IS NOT NULL "
+            "ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (),
+        )
+
+    # -------------------------
+    # Import
+    # -------------------------
+
+    def import_json(self, path: Path) -> int:
+        """
+        Append records from a history.json list or a .jsonl journal.
+        Returns the number of records imported.
+        """
+        if path.suffix == ".jsonl":
+            records, _ = read_journal(path)
+        else:
+            records = read_json_list(path)
+
+        with self._lock, self._conn:
+            self._insert_many(records)
+        return len(records)
+
+    # -------------------------
+    # Internal helpers
+    # -------------------------
+
+    def _import_legacy(self) -> None:
+        # One-time import into a fresh database; the journal is newer than
+        # history.json if both exist.
+        for legacy in (self._config.journal_path, self._config.file_path):
+            if legacy.exists():
+                self.import_json(legacy)
+                return
+
+    def _insert(self, record: Dict[str, Any]) -> None:
+        self._conn.execute(
+            f"INSERT INTO history ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            tuple(record.get(c) for c in COLUMNS),
+        )
+
+    def _insert_many(self, records) -> None:
+        self._conn.executemany(
+            f"INSERT INTO history ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?)",
+            (tuple(r.get(c) for c in COLUMNS) for r in records),
+        )
+
+    def _series(self, sql: str, params) -> Tuple[List[float], List[int]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        xs, ys = [], []
+        for ts, xp in rows:
+            days = timestamp_to_days(ts)
+            if days is None:
+                continue
+            xs.append(days)
+            ys.append(int(xp))
+        return xs, ys
+
+    def _series_by_level(self, sql: str, params) -> Dict[int, Tuple[List[float], List[int]]]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        series: Dict[int, Tuple[List[float], List[int]]] = {}
+        for level, ts, xp in rows:
+            days = timestamp_to_days(ts)
+            if days is None:
+                continue
+            xs, ys = series.setdefault(level, ([], []))
+            xs.append(days)
+            ys.append(int(xp))
+        return series
+
+    def _scalar(self, sql: str, params) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return int(row[0]) if row else None
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+class SqliteHistoryIndex:
+    """
+    HistoryIndex-compatible view over SqliteStorageService: every lookup is
+    an indexed query, so there is nothing to build or keep in sync.
+    """
+    def __init__(self, storage: SqliteStorageService):
+        self._storage = storage
+
+    def aspect_series(self, aspect: str, level: int) -> Tuple[List[float], List[int]]:
+        return self._storage.aspect_series(aspect, level)
+
+    def chain_series(self, level: int) -> Tuple[List[float], List[int]]:
+        return self._storage.chain_series(level)
+
+    def aspect_series_by_level(self, aspect: str) -> Dict[int, Tuple[List[float], List[int]]]:
+        return self._storage.aspect_series_by_level(aspect)
+
+    def chain_series_by_level(self) -> Dict[int, Tuple[List[float], List[int]]]:
+        return self._storage.chain_series_by_level()
+
+    def latest_aspect_xp(self, aspect: str, level: int) -> Optional[int]:
+        return self._storage.latest_aspect_xp(aspect, level)
+
+    def latest_chain_xp(self, level: int) -> Optional[int]:
+        return self._storage.latest_chain_xp(level)
+
+    def current_aspect_levels(self) -> Dict[str, int]:
+        return self._storage.current_aspect_levels()
+
+    def current_chain_level(self) -> Optional[int]:
+        return self._storage.current_chain_level()
@@ -1,63 +1,425 @@
 from __future__ import annotations
 
+import atexit
+import functools
 import json
+import logging
+import os
+import threading
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from models.entry import HistoryFrame
+from services.history_index import HistoryIndex
+from services.write_behind import WriteBehindWriter
+
+log = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
 class StorageConfig:
     """
     Centralize where/how data is stored so you don't scatter paths everywhere.
+
+    backend:
+      "json"   -> one JSON list in `filename`, rewritten on every change.
+      "jsonl"  -> append-only journal in `journal_filename` (one record per line).
+      "sqlite" -> indexed SQLite database in `db_filename` (see open_storage()).
+
+    Journal compaction (compact_if_needed) kicks in once there are at least
+    `compact_min_tombstones` tombstones and they make up `compact_ratio` of
+    the live records.
+
+    write_behind (jsonl only): appends and deletes land in memory and are
+    visible to reads at once; a background writer group-commits them within
+    `write_behind_latency_ms`. fsync is "none" (leave it to the OS) or
+    "batch" (fsync after every journal write, i.e. once per group commit).
+
+    rollup_cache: keep the daily/weekly rollups built this session in
+    `rollups_filename` on close() and reuse them on the next start while the
+    history file is unchanged.
     """
     data_dir: Path
     filename: str = "history.json"
+    backend: str = "json"
+    journal_filename: str = "history.jsonl"
+    db_filename: str = "history.db"
+    compact_min_tombstones: int = 50
+    compact_ratio: float = 0.1
+    write_behind: bool = False
+    write_behind_latency_ms: int = 250
+    fsync: str = "none"
+    rollup_cache: bool = False
+    rollups_filename: str = "history.rollups.json"
 
     @property
     def file_path(self) -> Path:
         return self.data_dir / self.filename
 
+    @property
+    def journal_path(self) -> Path:
+        return self.data_dir / self.journal_filename
+
+    @property
+    def db_path(self) -> Path:
+        return self.data_dir / self.db_filename
+
+    @property
+    def rollups_path(self) -> Path:
+        return self.data_dir / self.rollups_filename
+
+
+def open_storage(config: StorageConfig):
+    """
+    Create the storage service for `config.backend`.
+    All backends share the StorageService public API.
+    """
+    if config.backend == "sqlite":
+        from services.sqlite_storage import SqliteStorageService
+        return SqliteStorageService(config)
+    return StorageService(config)
+
+
+def read_json_list(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read a history.json style file (one JSON list). Missing/invalid -> [].
+    """
+    if not path.exists():
+        return []
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, list) else []
+    except json.JSONDecodeError:
+        return []
+
+
+def read_journal(path: Path) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Read a JSON Lines journal and apply its tombstones.
+    Returns (records, number of tombstones seen).
+    """
+    if not path.exists():
+        return [], 0
+
+    records: List[Dict[str, Any]] = []
+    # timestamp -> number of records that existed when it was deleted
+    deleted: Dict[str, int] = {}
+    tombstones = 0
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            entry = _parse_journal_line(line)
+            if entry is None:
+                continue
+            if entry.get("op") == "delete":
+                deleted[entry.get("timestamp", "")] = len(records)
+                tombstones += 1
+            else:
+                records.append(entry)
+
+    if not deleted:
+        return records, tombstones
+
+    # A tombstone only removes records written before it, so a re-saved
+    # entry with the same timestamp survives.
+    return [
+        r for seq, r in enumerate(records)
+        if seq >= deleted.get(r.get("timestamp", ""), -1)
+    ], tombstones
+
+
+def read_journal_frame(path: Path) -> Tuple[HistoryFrame, int]:
+    """
+    read_journal() into a HistoryFrame, one line at a time: the records are
+    never all in memory as dicts.
+    """
+    frame = HistoryFrame()
+    deleted: Dict[str, int] = {}
+    tombstones = 0
+    if not path.exists():
+        return frame, tombstones
+
+    def records(f):
+        nonlocal tombstones
+        seq = 0
+        for line in f:
+            entry = _parse_journal_line(line)
+            if entry is None:
+                continue
+            if entry.get("op") == "delete":
+                deleted[entry.get("timestamp", "")] = seq
+                tombstones += 1
+            else:
+                seq += 1
+                yield entry
+
+    with open(path, "r", encoding="utf-8") as f:
+        frame.extend(records(f))
+
+    return (frame.without(deleted) if deleted else frame), tombstones
+
+
+def iter_journal(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a journal's live records (same result as read_journal).
+
+    A first pass only collects the tombstones, so memory is bounded by the
+    number of deletes rather than the size of the history.
+    """
+    if not path.exists():
+        return
+
+    # Both passes number records the same way: every non-blank, non-delete line
+    deleted: Dict[str, int] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        seq = 0
+        for line in f:
+            if '"op"' in line:
+                entry = _parse_journal_line(line)
+                if entry is not None and entry.get("op") == "delete":
+                    deleted[entry.get("timestamp", "")] = seq
+                    continue
+            if line.strip():
+                seq += 1
+
+    with open(path, "r", encoding="utf-8") as f:
+        seq = 0
+        for line in f:
+            if not line.strip():
+                continue
+            entry = _parse_journal_line(line)
+            if entry is not None and entry.get("op") == "delete":
+                continue
+            seq += 1
+            if entry is not None and seq - 1 >= deleted.get(entry.get("timestamp", ""), -1):
+                yield entry
+
+
+def iter_json_list(f, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Items of a top-level JSON list in the open text file `f`, decoded
+    incrementally so the whole document is never in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def skip(chars):
+        # Advance past `chars`; False if the input ran out first
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return pos < len(buf)
+            fill()
+
+    if not skip(" \t\r\n") or buf[pos] != "[":
+        raise ValueError("Expected a JSON list")
+    pos += 1
+
+    while True:
+        if not skip(" \t\r\n,"):
+            raise ValueError("Unterminated JSON list")
+        if buf[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise ValueError(f"Invalid JSON near character {pos}") from None
+            fill()
+            continue
+        if end == len(buf) and not eof:
+            # Could be a truncated number; decode again with more input
+            fill()
+            continue
+        pos = end
+        yield item
+
+
+def filter_records(
+    records: Iterator[Dict[str, Any]],
+    aspect: Optional[str] = None,
+    aspect_level: Optional[int] = None,
+    chain_level: Optional[int] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily keep the records matching every given filter. `start`/`end` are
+    ISO timestamps (inclusive / exclusive), compared as strings.
+    """
+    for r in records:
+        if not isinstance(r, dict):
+            continue
+        if aspect is not None and r.get("aspect") != aspect:
+            continue
+        if aspect_level is not None and r.get("aspect_level") != aspect_level:
+            continue
+        if chain_level is not None and r.get("chain_level") != chain_level:
+            continue
+        ts = r.get("timestamp", "")
+        if start is not None and ts < start:
+            continue
+        if end is not None and ts >= end:
+            continue
+        yield r
+
+
+def _parse_journal_line(line: str) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        # Torn write from a crash mid-append; skip it.
+        return None
+    return entry if isinstance(entry, dict) else None
+
+
+def _synchronized(method):
+    # Serialize public calls; the controller reads from worker threads.
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class StorageService:
     """
     JSON storage for a simple append-only history log.
+
+    In "jsonl" mode an append writes a single line, and a delete writes a
+    tombstone line ({"op": "delete", "timestamp": ...}). Neither touches the
+    rest of the history: cached records are filtered lazily on the next full
+    read. compact() folds the tombstones back into a clean journal, and
+    compact_if_needed() only does so past the configured threshold.
+
+    The history is cached as a models.entry.HistoryFrame (typed columns),
+    not as dicts; load_frame() hands out a copy.
+
+    Public methods are thread-safe.
     """
     def __init__(self, config: StorageConfig):
         self._config = config
+        self._lock = threading.RLock()
+        self._journal_tombstones = 0
+
+        # Parsed history + the (mtime, size, inode) of the file it came from
+        self._cache: Optional[HistoryFrame] = None
+        self._cache_signature: Optional[Tuple[int, int, int]] = None
+        # Built lazily from the cache, dropped whenever the cache is replaced
+        self._index: Optional[HistoryIndex] = None
+        # Deletes not yet applied to the cache: timestamp -> len(cache) at the
+        # time, same rule as journal tombstones
+        self._pending_deletes: Dict[str, int] = {}
+        # Journal lines accepted but not yet on disk (write-behind mode)
+        self._write_queue: List[Dict[str, Any]] = []
+        self._writer: Optional[WriteBehindWriter] = None
+
         self._ensure_data_dir()
 
+        if self._is_journal():
+            self._migrate_to_journal()
+            if config.write_behind:
+                self._writer = WriteBehindWriter(
+                    self.flush, config.write_behind_latency_ms / 1000
+                )
+                # Backstop for exits that skip close()
+                atexit.register(self.close)
+
     # -------------------------
     # Public API (controller uses these)
     # -------------------------
 
+    @_synchronized
     def load_history(self) -> List[Dict[str, Any]]:
         """
-        Load and return all saved records.
+        Load and return all saved records, as new dicts.
+
+        Builds a dict per record; load_frame() is the compact way to get
+        the whole history.
         """
-        path = self._config.file_path
-        if not path.exists():
-            return []
+        return list(self._cached_records().iter_records())
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, list) else []
-        except json.JSONDecodeError:
-            return []
+    @_synchronized
+    def load_frame(self) -> HistoryFrame:
+        """
+        Copy of the history as a HistoryFrame (safe to use on another thread).
+
+        The parsed history is cached and only re-read when the file's mtime,
+        size or inode changes.
+        """
+        return self._cached_records().copy()
 
+    @_synchronized
+    def history_index(self) -> HistoryIndex:
+        """
+        Per-series indexes over the current history (see HistoryIndex).
+        Kept up to date on append/delete; rebuilt after an external change.
+        """
+        # The index already left out deleted entries, so pending deletes only
+        # need applying when it's (re)built
+        frame = self._cached_records(apply_deletes=self._index is None)
+        if self._index is None:
+            self._index = HistoryIndex.from_frame(frame)
+        return self._index
+
+    @_synchronized
     def append_record(self, record: Dict[str, Any]) -> None:
         """
         Append a single record to history and persist it.
         """
+        self.append_records([record])
+
+    @_synchronized
+    def append_records(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Append several records with a single write (bulk import).
+        Nothing is loaded in journal mode if history hasn't been read yet.
+        """
+        if not records:
+            return
+
+        if self._is_journal():
+            cache_valid = self._cache_is_fresh()
+            self._write_journal_entries(records)
+            if cache_valid:
+                self._cache.extend(records)
+                self._cache_signature = self._file_signature()
+                if self._index is not None:
+                    for record in records:
+                        self._index.add(record)
+            return
+
         history = self.load_history()
-        history.append(record)
+        history.extend(records)
         self.save_history(history)
 
+    @_synchronized
     def save_history(self, records: List[Dict[str, Any]]) -> None:
         """
         Save entire history list (overwrite) in a safe way.
         """
+        if self._is_journal():
+            self._write_journal(records)
+            return
+
         path = self._config.file_path
         temp_path = path.with_suffix(".tmp")
 
@@ -65,6 +427,200 @@ class StorageService:
             json.dump(records, f, indent=2)
 
         temp_path.replace(path)
+        self._remember(records)
+
+    @_synchronized
+    def delete_record(self, timestamp: str) -> None:
+        """
+        Remove every record with the given timestamp.
+        Journal mode only appends a tombstone; the file is cleaned up by compact().
+        """
+        if not timestamp:
+            return
+
+        if self._is_journal():
+            cache_valid = self._cache_is_fresh()
+            self._write_journal_entries([{"op": "delete", "timestamp": timestamp}])
+            self._journal_tombstones += 1
+            if cache_valid:
+                self._pending_deletes[timestamp] = len(self._cache)
+                self._cache_signature = self._file_signature()
+                if self._index is not None:
+                    self._index.remove_timestamp(timestamp)
+            return
+
+        records = self.load_history()
+        self.save_history([r for r in records if r.get("timestamp") != timestamp])
+
+    def compact(self) -> bool:
+        """
+        Rewrite the journal without tombstones or deleted records.
+        Returns True if the file was rewritten.
+
+        The lock is only held to take a snapshot and to swap the new file
+        in, not while writing it: saves and deletes made meanwhile go to the
+        old journal and are carried over. Gives up (False) if something else
+        changed the file in between.
+        """
+        if not self._is_journal():
+            return False
+
+        with self._lock:
+            self.flush()
+            records = self._cached_records()
+            if self._journal_tombstones == 0:
+                return False
+            snapshot = records.copy()
+            tombstones = self._journal_tombstones
+            offset = self._cache_signature[1]  # journal size the snapshot matches
+
+        path = self._config.journal_path
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record in snapshot.iter_records():
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+        with self._lock:
+            self.flush()
+            if not self._cache_is_fresh():
+                temp_path.unlink(missing_ok=True)
+                return False
+
+            # Our own appends/tombstones since the snapshot, as written
+            with open(path, "rb") as old, open(temp_path, "ab") as f:
+                old.seek(offset)
+                f.write(old.read())
+                self._sync(f)
+            temp_path.replace(path)
+
+            # The cache (and index) already hold exactly what the new file does
+            self._cache_signature = self._file_signature()
+            self._journal_tombstones -= tombstones
+        return True
+
+    @_synchronized
+    def needs_compaction(self) -> bool:
+        if not self._is_journal():
+            return False
+        tombstones = self._journal_tombstones
+        live = len(self._cache) if self._cache is not None else 0
+        return (
+            tombstones >= self._config.compact_min_tombstones
+            and tombstones >= self._config.compact_ratio * max(1, live)
+        )
+
+    def compact_if_needed(self) -> bool:
+        """
+        compact() once enough tombstones have piled up. Cheap to call often.
+        Not synchronized as a whole: compact() locks only where it must.
+        """
+        return self.compact() if self.needs_compaction() else False
+
+    @_synchronized
+    def aspect_series(self, aspect: str, level: int) -> Tuple[List[float], List[int]]:
+        """
+        Copy of one (aspect, aspect_level) series, safe to use on another thread.
+        """
+        xs, ys = self.history_index().aspect_series(aspect, level)
+        return list(xs), list(ys)
+
+    @_synchronized
+    def chain_series(self, level: int) -> Tuple[List[float], List[int]]:
+        """
+        Copy of one chain_level series, safe to use on another thread.
+        """
+        xs, ys = self.history_index().chain_series(level)
+        return list(xs), list(ys)
+
+    @_synchronized
+    def aspect_series_by_level(self, aspect: str) -> Dict[int, Tuple[List[float], List[int]]]:
+        """
+        Copies of every level's series for `aspect` (see aspect_series).
+        """
+        series = self.history_index().aspect_series_by_level(aspect)
+        return {level: (list(xs), list(ys)) for level, (xs, ys) in series.items()}
+
+    @_synchronized
+    def chain_series_by_level(self) -> Dict[int, Tuple[List[float], List[int]]]:
+        series = self.history_index().chain_series_by_level()
+        return {level: (list(xs), list(ys)) for level, (xs, ys) in series.items()}
+
+    @_synchronized
+    def aspect_rollup(self, aspect: str, level: int, period: str) -> Dict[str, List]:
+        """
+        Copy of the `period` ("day"/"week") buckets of one (aspect,
+        aspect_level) series, as columns (see services.rollups).
+        """
+        return self._rollup_index().aspect_rollup(aspect, level, period).as_dict()
+
+    @_synchronized
+    def chain_rollup(self, level: int, period: str) -> Dict[str, List]:
+        return self._rollup_index().chain_rollup(level, period).as_dict()
+
+    @_synchronized
+    def flush(self) -> None:
+        """
+        Write queued write-behind entries to the journal in one batch.
+        """
+        if not self._write_queue:
+            return
+
+        entries, self._write_queue = self._write_queue, []
+        cache_valid = self._cache_is_fresh()
+        try:
+            self._append_journal_lines(entries)
+        except OSError:
+            self._write_queue[:0] = entries
+            raise
+        if cache_valid:
+            # Our own write; the cache already has these entries
+            self._cache_signature = self._file_signature()
+
+    def close(self) -> None:
+        """
+        Stop the write-behind thread, flush whatever is still queued and
+        drop the cached history. Safe to call more than once.
+        """
+        # Not synchronized: the writer thread may be waiting on the lock
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.stop()
+            # The atexit entry would otherwise keep this instance (and its
+            # cache) alive after ProfileManager evicts it
+            atexit.unregister(self.close)
+        self.flush()
+        self._save_rollups()
+        with self._lock:
+            # Re-read from disk if used again
+            self._cache = None
+            self._cache_signature = None
+            self._index = None
+            self._pending_deletes = None
+
+    def iter_records(
+        self,
+        aspect: Optional[str] = None,
+        aspect_level: Optional[int] = None,
+        chain_level: Optional[int] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield matching records, oldest first (see filter_records()).
+
+        If history is already loaded the filters are one vectorized mask over
+        the cached frame (start/end compared as times, see HistoryFrame.mask),
+        otherwise the file is streamed; either way no second copy of the
+        history is made.
+        """
+        filters = dict(aspect=aspect, aspect_level=aspect_level, chain_level=chain_level, start=start, end=end)
+        with self._lock:
+            self.flush()
+            frame = self._cached_records() if self._cache_is_fresh() else None
+            if frame is not None:
+                # Rows past len(frame) may be appended meanwhile; these stay put
+                return frame.iter_records(frame.select(**filters))
+        return filter_records(self._iter_all(), **filters)
 
     # -------------------------
     # Convenience helpers
@@ -79,7 +635,21 @@ class StorageService:
         pass
 
     def file_exists(self) -> bool:
-        return self._config.file_path.exists()
+        return self._active_path().exists()
+
+    @property
+    def data_path(self) -> Path:
+        """
+        The file the active backend reads and writes.
+        """
+        return self._active_path()
+
+    def is_stale(self) -> bool:
+        """
+        True if the file changed on disk since we last read or wrote it.
+        Not synchronized (one stat), so the GUI thread never waits on a load.
+        """
+        return not self._cache_is_fresh()
 
     # -------------------------
     # Internal helpers
@@ -88,3 +658,155 @@ class StorageService:
     def _ensure_data_dir(self) -> None:
         # Create the data directory if missing.
         self._config.data_dir.mkdir(parents=True, exist_ok=True)
+
+    def _is_journal(self) -> bool:
+        return self._config.backend == "jsonl"
+
+    def _active_path(self) -> Path:
+        if self._is_journal():
+            return self._config.journal_path
+        return self._config.file_path
+
+    def _iter_all(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            self.flush()
+            frame = self._cached_records() if self._cache_is_fresh() else None
+            count = len(frame) if frame is not None else 0
+
+        if frame is not None:
+            # Appends only extend this frame and deletes replace it, so the
+            # first `count` rows stay put while we walk them
+            yield from frame.iter_records(range(count))
+        elif self._is_journal():
+            yield from iter_journal(self._config.journal_path)
+        elif self._config.file_path.exists():
+            with open(self._config.file_path, "r", encoding="utf-8") as f:
+                try:
+                    yield from iter_json_list(f)
+                except ValueError:
+                    return  # same as read_json_list(): invalid file -> no records
+
+    def _read_records(self) -> HistoryFrame:
+        if self._is_journal():
+            return self._load_journal()
+        return HistoryFrame.from_records(read_json_list(self._config.file_path))
+
+    # -------------------------
+    # Cache helpers
+    # -------------------------
+
+    def _cached_records(self, apply_deletes: bool = True) -> HistoryFrame:
+        # apply_deletes=False may return rows with pending deletes still in
+        # them; they're only applied (a full copy) for reads that need them
+        signature = self._file_signature()
+        if self._cache is not None and signature == self._cache_signature:
+            if apply_deletes and self._pending_deletes:
+                self._apply_pending_deletes()
+            return self._cache
+
+        if self._write_queue:
+            # Changed on disk: get our queued entries in before re-reading
+            self.flush()
+            signature = self._file_signature()
+
+        self._cache = self._read_records()
+        self._cache_signature = signature
+        self._index = None
+        self._pending_deletes = {}
+        return self._cache
+
+    def _rollup_index(self) -> HistoryIndex:
+        index = self.history_index()
+        if index.rollups is None:
+            # numpy; only paid for once rollups are asked for
+            from services.rollups import Rollups
+
+            rollups = None
+            # Queued entries are in the index but not in the file the sidecar matches
+            if self._config.rollup_cache and not self._write_queue and self._cache_is_fresh():
+                rollups = Rollups.load(self._config.rollups_path, self._cache_signature)
+            index.attach_rollups(rollups if rollups is not None else Rollups())
+        return index
+
+    @_synchronized
+    def _save_rollups(self) -> None:
+        index = self._index
+        if not self._config.rollup_cache or index is None or not index.rollups:
+            return
+        if self._write_queue or not self._cache_is_fresh():
+            return  # the index no longer matches the file
+        try:
+            index.rollups.save(self._config.rollups_path, self._cache_signature)
+        except OSError:
+            log.exception("Could not write %s", self._config.rollups_path)
+
+    def _apply_pending_deletes(self) -> None:
+        self._cache = self._cache.without(self._pending_deletes)
+        self._pending_deletes = {}
+
+    def _file_signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self._active_path().stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _cache_is_fresh(self) -> bool:
+        return self._cache is not None and self._file_signature() == self._cache_signature
+
+    def _remember(self, records) -> None:
+        # Called after our own full writes so the next read is free.
+        if not isinstance(records, HistoryFrame):
+            records = HistoryFrame.from_records(records)
+        self._cache = records
+        self._cache_signature = self._file_signature()
+        self._index = None
+        self._pending_deletes = {}
+
+    def _migrate_to_journal(self) -> None:
+        # One-time import of the legacy history.json list. The old file is left
+        # in place; once the journal exists it is the source of truth.
+        journal = self._config.journal_path
+        legacy = self._config.file_path
+        if journal.exists() or not legacy.exists():
+            return
+
+        self._write_journal(read_json_list(legacy))
+
+    def _load_journal(self) -> HistoryFrame:
+        frame, self._journal_tombstones = read_journal_frame(self._config.journal_path)
+        return frame
+
+    def _write_journal_entries(self, entries: List[Dict[str, Any]]) -> None:
+        if self._writer is None:
+            self._append_journal_lines(entries)
+            return
+        self._write_queue.extend(entries)
+        self._writer.notify()
+
+    def _append_journal_lines(self, entries: List[Dict[str, Any]]) -> None:
+        with open(self._config.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, separators=(",", ":")) + "\n" for e in entries))
+            self._sync(f)
+
+    def _sync(self, f) -> None:
+        if self._config.fsync == "batch":
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_journal(self, records) -> None:
+        # `records`: a list of dicts or a HistoryFrame
+        path = self._config.journal_path
+        temp_path = path.with_suffix(".tmp")
+
+        rows = records.iter_records() if isinstance(records, HistoryFrame) else records
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for record in rows:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._sync(f)
+
+        temp_path.replace(path)
+        # The rewrite already holds everything that was queued
+        self._write_queue = []
+        self._journal_tombstones = 0
+        self._remember(records)
@@ -0,0 +1,52 @@
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class WriteBehindWriter:
+    """
+    Background thread for group commit: after notify(), it waits up to
+    `latency_s` for more writes to pile up and then calls `flush()` once for
+    the whole batch.
+
+    `flush` owns the queue and its locking; this class only decides when.
+    """
+    def __init__(self, flush, latency_s: float):
+        self._flush = flush
+        self._latency_s = latency_s
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name="history-write-behind", daemon=True)
+        self._thread.start()
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def stop(self) -> None:
+        """
+        Stop the thread. Anything still queued is left for the caller to flush.
+        """
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            if self._stop.is_set():
+                return
+
+            # Group commit window; stop() cuts it short
+            self._stop.wait(self._latency_s)
+            self._wake.clear()
+
+            try:
+                self._flush()
+            except Exception:
+                # Entries stay queued and are retried on the next write
+                log.exception("Write-behind flush failed")
+
+            if self._stop.is_set():
+                return
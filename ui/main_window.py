@@ -1,10 +1,11 @@
 # ui/main_window.py
 
 import sys
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
 from PyQt5.QtGui import (QFont, QIntValidator,)
 from PyQt5.QtWidgets import (
     QApplication,
+    QCheckBox,
     QComboBox,
     QFrame,
     QGridLayout,
@@ -14,16 +15,37 @@ from PyQt5.QtWidgets import (
     QLineEdit,
     QMainWindow,
     QSizePolicy,
-    QTableWidget,
+    QTabWidget,
+    QTableView,
     QVBoxLayout,
     QWidget,
     QPushButton, QProgressBar,
 )
-from ui.widgets.mpl_graph import MplGraph
+from models.rules import ASPECT_XP_MAX, CHAIN_XP_MAX
+from ui.widgets.lazy_graph import LazyGraph
+from ui.widgets.history_table import (
+    DELETE_COLUMN,
+    DeleteButtonDelegate,
+    HistoryTableModel,
+    HistoryTableView,
+)
+from ui.widgets.summary_table import SummaryTableModel
+from utils.startup import elapsed_ms
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    """
+    fast_start: show the window before matplotlib is imported. The graphs
+    start as LazyGraph placeholders and are built right after the first
+    paint; either way the graphs expose plot_timeseries().
+    """
+    # ms from process start (utils.startup) until the first frame is up
+    first_painted = pyqtSignal(float)
+
+    def __init__(self, fast_start=True):
         super().__init__()
+        self.fast_start = fast_start
+        self.time_to_first_paint_ms = None
+        self._awaiting_first_paint = True
         self.setWindowTitle("XP Tracker")
         self.setMinimumSize(900, 650)
 
@@ -47,7 +69,7 @@ class MainWindow(QMainWindow):
         self.aspect_xp_input = QLineEdit()
         self.aspect_xp_input.setPlaceholderText("Enter XP")
         # Input validation
-        xp_validator_aspect = QIntValidator(0, 250_000, self)
+        xp_validator_aspect = QIntValidator(0, ASPECT_XP_MAX, self)
         self.aspect_xp_input.setValidator(xp_validator_aspect)
 
         # Right (Chain)
@@ -57,9 +79,39 @@ class MainWindow(QMainWindow):
         self.chain_xp_input = QLineEdit()
         self.chain_xp_input.setPlaceholderText("Enter XP")
         # Input validation
-        xp_validator_chain = QIntValidator(0, 7_500_000, self)
+        xp_validator_chain = QIntValidator(0, CHAIN_XP_MAX, self)
         self.chain_xp_input.setValidator(xp_validator_chain)
 
+        # ---- Profile row (which character's history is shown) ----
+        self.profile_combo = QComboBox()
+        self.profile_combo.setMinimumWidth(220)
+
+        self.new_profile_button = QPushButton("New…")
+        self.new_profile_button.setObjectName("secondaryButton")
+
+        # What the graphs plot (current level only, lifetime across levels, ...)
+        self.view_combo = QComboBox()
+        self.view_combo.setMinimumWidth(180)
+
+        # Legend of the all-aspects overlay
+        self.legend_check = QCheckBox("Legend")
+        self.legend_check.setChecked(True)
+        self.legend_check.setEnabled(False)  # only used by the "All aspects" view
+
+        profile_row = QHBoxLayout()
+        profile_row.setSpacing(10)
+        profile_label = QLabel("Character:")
+        profile_label.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        profile_label.setMinimumWidth(110)
+        profile_row.addWidget(profile_label)
+        profile_row.addWidget(self.profile_combo)
+        profile_row.addWidget(self.new_profile_button)
+        profile_row.addStretch(1)
+        profile_row.addWidget(QLabel("Graphs:"))
+        profile_row.addWidget(self.view_combo)
+        profile_row.addWidget(self.legend_check)
+        root.addLayout(profile_row)
+
         # ---- Top controls row (2 columns) ----
         controls_row = QHBoxLayout()
         controls_row.setSpacing(18)
@@ -73,6 +125,7 @@ class MainWindow(QMainWindow):
 
         actions_row = QHBoxLayout()
         actions_row.addStretch(1)
+        actions_row.addWidget(self.export_button)
         actions_row.addWidget(self.save_button)
         root.addLayout(actions_row)
 
@@ -83,8 +136,8 @@ class MainWindow(QMainWindow):
         self.graph1_panel = self._panel_frame()
         self.graph2_panel = self._panel_frame()
 
-        self.aspect_xp_graph = MplGraph(self.graph1_panel)
-        self.aspect_level_graph = MplGraph(self.graph2_panel)
+        self.aspect_xp_graph = self._make_graph(self.graph1_panel)
+        self.aspect_level_graph = self._make_graph(self.graph2_panel)
 
         # Put canvases inside the frames
         g1_layout = QVBoxLayout(self.graph1_panel)
@@ -122,10 +175,19 @@ class MainWindow(QMainWindow):
         history_layout = QVBoxLayout(history_group)
         history_layout.setContentsMargins(14, 14, 14, 14)
 
-        self.history_table = QTableWidget(0, 7)
-        self.history_table.setHorizontalHeaderLabels(
-            ["Timestamp", "Aspect", "Aspect Level", "Aspect XP", "Chain Level", "Chain XP", "     "]
-        )
+        # Shown while history loads in the background
+        self.history_loading_label = QLabel("Loading history…")
+        self.history_loading_label.setObjectName("loadingLabel")
+        self.history_loading_label.setVisible(False)
+        history_layout.addWidget(self.history_loading_label)
+
+        # Model/view: only visible rows are ever materialized
+        self.history_model = HistoryTableModel(self)
+        self.history_delete_delegate = DeleteButtonDelegate(self)
+
+        self.history_table = HistoryTableView()
+        self.history_table.setModel(self.history_model)
+        self.history_table.setItemDelegateForColumn(DELETE_COLUMN, self.history_delete_delegate)
 
         self.history_table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.history_table.setAlternatingRowColors(True)
@@ -135,15 +197,63 @@ class MainWindow(QMainWindow):
         #self.history_table.setSortingEnabled(True)
         header = self.history_table.horizontalHeader()
         header.setSectionResizeMode(header.Stretch)
-        header.setSectionResizeMode(6, header.ResizeToContents)
-        self.history_table.setColumnWidth(6, 36)  # or 32
+        # Fixed, not ResizeToContents: that would measure every row
+        header.setSectionResizeMode(DELETE_COLUMN, header.Fixed)
+        self.history_table.setColumnWidth(DELETE_COLUMN, 36)
+
+        # ---- Summary: rate and ETA for every series at its current level ----
+        self.summary_model = SummaryTableModel(self)
+        self.summary_table = QTableView()
+        self.summary_table.setModel(self.summary_model)
+        self.summary_table.setAlternatingRowColors(True)
+        self.summary_table.setSelectionBehavior(self.summary_table.SelectRows)
+        self.summary_table.setEditTriggers(self.summary_table.NoEditTriggers)
+        self.summary_table.verticalHeader().setVisible(False)
+        header = self.summary_table.horizontalHeader()
+        header.setSectionResizeMode(header.Stretch)
 
-        history_layout.addWidget(self.history_table, 1)
+        self.history_tabs = QTabWidget()
+        self.history_tabs.addTab(self.history_table, "Entries")
+        self.history_tabs.addTab(self.summary_table, "Summary")
+
+        history_layout.addWidget(self.history_tabs, 1)
         root.addWidget(history_group, 1)
 
         # ---- Styling ----
         self._apply_styles()
 
+    def _make_graph(self, parent):
+        if self.fast_start:
+            return LazyGraph(parent)
+        from ui.widgets.mpl_graph import MplGraph
+        return MplGraph(parent)
+
+    def load_graphs(self):
+        """
+        Build any graph canvases that were deferred by fast_start.
+        """
+        for graph in (self.aspect_xp_graph, self.aspect_level_graph):
+            if isinstance(graph, LazyGraph):
+                graph.load()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._awaiting_first_paint:
+            self._awaiting_first_paint = False
+            # Runs once this paint pass (children included) is done
+            QTimer.singleShot(0, self._on_first_paint)
+
+    def _on_first_paint(self):
+        self.time_to_first_paint_ms = elapsed_ms()
+        self.first_painted.emit(self.time_to_first_paint_ms)
+        if self.fast_start:
+            # Give the event loop one more turn before the heavy import
+            QTimer.singleShot(0, self.load_graphs)
+
+    def set_history_loading(self, loading):
+        self.history_loading_label.setVisible(loading)
+        self.history_table.setEnabled(not loading)
+
     def _build_aspect_panel(self):
         """
         Aspect row 1:
@@ -215,6 +325,9 @@ class MainWindow(QMainWindow):
         self.save_button = QPushButton("Save")
         self.save_button.setDefault(True)  # Enter key trigger
 
+        self.export_button = QPushButton("Export…")
+        self.export_button.setObjectName("secondaryButton")
+
         layout.addWidget(lbl1, 0, 0)
         layout.addWidget(self.chain_combo, 0, 1)
         layout.addWidget(lbl2, 1, 0)
@@ -294,6 +407,11 @@ class MainWindow(QMainWindow):
                 border-radius: 14px;
             }
 
+            QLabel#loadingLabel {
+                color: #9aa6b2;
+                font-style: italic;
+            }
+
             QLabel#panelTitle {
                 font-size: 14px;
                 font-weight: 600;
@@ -366,28 +484,20 @@ class MainWindow(QMainWindow):
                 background: #245cc4;
             }
             
+            QPushButton#secondaryButton {
+                background: #232834;
+                color: #e6e9ef;
+            }
+
+            QPushButton#secondaryButton:hover {
+                background: #2a2f3a;
+            }
+
             QPushButton:disabled {
                 background: #2a2f3a;
                 color: #9aa6b2;
             }
             
-            QToolButton#deleteButton {
-                background-color: #b83b3b;
-                color: #ffffff;
-                border: none;
-                font-weight: 600;
-                margin-right: 4
-            }
-            
-            QToolButton#deleteButton:hover {
-                background-color: #d64545;
-            }
-            
-            QToolButton#deleteButton:pressed {
-                background-color: #9f2f2f;
-            }
-
-
             /* --- ComboBox dropdown list --- */
             QComboBox QAbstractItemView {
                 background: #151922;              /* same as cards */
@@ -408,7 +518,7 @@ class MainWindow(QMainWindow):
             }
 
             /* --- Table / History --- */
-            QTableWidget {
+            QTableView {
                 border: 1px solid #2a2f3a;
                 border-radius: 12px;
                 background: #151922;
@@ -428,16 +538,41 @@ class MainWindow(QMainWindow):
                 padding: 8px;
             }
 
-            QTableWidget::item {
+            QTableView::item {
                 padding: 6px;
                 border-bottom: 1px solid #1f2430;
             }
 
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: #203a72;
                 color: #ffffff;
             }
 
+            /* --- History tabs --- */
+            QTabWidget::pane {
+                border: none;
+            }
+
+            QTabBar::tab {
+                background: #111520;
+                color: #9aa6b2;
+                border: 1px solid #2a2f3a;
+                border-bottom: none;
+                border-top-left-radius: 8px;
+                border-top-right-radius: 8px;
+                padding: 6px 14px;
+                margin-right: 2px;
+            }
+
+            QTabBar::tab:selected {
+                background: #151922;
+                color: #e6e9ef;
+            }
+
+            QTabBar::tab:hover {
+                color: #e6e9ef;
+            }
+
             /* --- Scrollbars --- */
             QScrollBar:vertical {
                 background: transparent;
@@ -0,0 +1,257 @@
+from bisect import bisect_right, insort
+
+from PyQt5.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QPainter
+from PyQt5.QtWidgets import QStyle, QStyledItemDelegate, QTableView
+
+from models.entry import HistoryFrame
+from utils.timestamps import display_date
+
+HEADERS = ["Timestamp", "Aspect", "Aspect Level", "Aspect XP", "Chain Level", "Chain XP", "     "]
+DELETE_COLUMN = 6
+
+
+class HistoryTableModel(QAbstractTableModel):
+    """
+    Read-only model over a HistoryFrame, shown newest first.
+    Cell text is only built when the view asks for it, i.e. for visible rows.
+
+    The frame is kept oldest-first (same order as storage), so adding a new
+    entry at the top of the table is an append. Only the newest `shown`
+    entries are rows; show_older() reveals more (progressive fill).
+    Deleted entries stay in the frame and are skipped, so a delete never
+    copies it.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._frame = HistoryFrame()
+        self._shown = 0
+        # Frame indexes of deleted entries, ascending
+        self._deleted = []
+
+    def set_frame(self, frame, shown=None):
+        """
+        Full rebuild. `frame` is owned by the model from now on; `shown` is
+        how many of its newest entries to show (all by default).
+        """
+        self.beginResetModel()
+        self._frame = frame
+        self._deleted = []
+        self._shown = len(frame) if shown is None else min(shown, len(frame))
+        self.endResetModel()
+
+    def set_records(self, records):
+        """
+        Full rebuild from records in storage (oldest-first) order.
+        """
+        self.set_frame(HistoryFrame.from_records(records))
+
+    def append_record(self, record):
+        """
+        Add a newly saved record as the top row.
+        """
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._frame.append(record)
+        self._shown += 1
+        self.endInsertRows()
+
+    def show_older(self, count):
+        """
+        Reveal up to `count` more entries as rows at the bottom.
+        Returns how many are still hidden.
+        """
+        count = min(count, self.hidden_count())
+        if count > 0:
+            first = self._shown
+            self.beginInsertRows(QModelIndex(), first, first + count - 1)
+            self._shown += count
+            self.endInsertRows()
+        return self.hidden_count()
+
+    def hidden_count(self):
+        return len(self._frame) - len(self._deleted) - self._shown
+
+    def remove_timestamp(self, timestamp):
+        """
+        Remove the entries with `timestamp` (storage deletes every record
+        with it), shown or not. Finding them is one vectorized compare.
+        """
+        # Newest first, so the rows of the ones still to go don't move
+        for i in reversed(self._frame.rows_with_timestamp(timestamp)):
+            if self._is_deleted(i):
+                continue
+            row = self._to_row(i)
+            if row < self._shown:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                insort(self._deleted, i)
+                self._shown -= 1
+                self.endRemoveRows()
+            else:
+                insort(self._deleted, i)
+
+    def entry_at(self, row):
+        return self._frame.entry(self._to_index(row))
+
+    def timestamp_at(self, row):
+        if 0 <= row < self._shown:
+            return self._frame.timestamp(self._to_index(row)) or ""
+        return ""
+
+    def _to_index(self, row):
+        # Row 0 is the newest entry, i.e. the end of the frame (and vice
+        # versa), skipping deleted ones: the lowest index whose position
+        # from the end (deleted ones above it don't count) reaches `row`.
+        if not self._deleted:
+            return len(self._frame) - 1 - row
+        target = len(self._frame) - 1 - row
+        lo, hi = 0, len(self._frame) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if mid + len(self._deleted) - bisect_right(self._deleted, mid) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _to_row(self, i):
+        # Inverse of _to_index() for a live index
+        return len(self._frame) - 1 - i - (len(self._deleted) - bisect_right(self._deleted, i))
+
+    def _is_deleted(self, i):
+        k = bisect_right(self._deleted, i)
+        return k > 0 and self._deleted[k - 1] == i
+
+    # ---- QAbstractTableModel ----
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._shown
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        col = index.column()
+        if role == Qt.DisplayRole and col != DELETE_COLUMN:
+            return self._display_value(self.entry_at(index.row()), col)
+        if role == Qt.ToolTipRole and col == DELETE_COLUMN:
+            return "Delete entry"
+        return None
+
+    @staticmethod
+    def _display_value(entry, col):
+        if col == 0:
+            # Memoized per day: repaints never re-parse timestamps
+            return display_date(entry.timestamp)
+        if col == 1:
+            return entry.aspect or ""
+        if col == 2:
+            return _text(entry.aspect_level)
+        if col == 3:
+            return f"{entry.aspect_xp or 0:,}"
+        if col == 4:
+            return _text(entry.chain_level)
+        if col == 5:
+            return f"{entry.chain_xp or 0:,}"
+        return ""
+
+
+def _text(value):
+    return "" if value is None else str(value)
+
+
+class DeleteButtonDelegate(QStyledItemDelegate):
+    """
+    Paints the small red "x" in the delete column and reports clicks on it,
+    instead of creating a QToolButton widget per row.
+    """
+    delete_requested = pyqtSignal(int)  # row
+
+    BUTTON_SIZE = 18
+    MARGIN_RIGHT = 4
+
+    def paint(self, painter, option, index):
+        # Let the base class draw selection / alternating row background
+        super().paint(painter, option, index)
+
+        rect = self._button_rect(option.rect)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor("#d64545" if hovered else "#b83b3b"))
+        painter.drawRect(rect)
+
+        font = QFont(option.font)
+        font.setWeight(QFont.DemiBold)
+        painter.setFont(font)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(rect, Qt.AlignCenter, "x")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and self._button_rect(option.rect).contains(event.pos())
+        ):
+            self.delete_requested.emit(index.row())
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def _button_rect(self, cell):
+        size = self.BUTTON_SIZE
+        x = cell.right() - self.MARGIN_RIGHT - size + 1
+        y = cell.top() + (cell.height() - size) // 2
+        return QRect(x, y, size, size)
+
+
+class HistoryTableView(QTableView):
+    """
+    QTableView that shows a pointing-hand cursor over the delete column and
+    keeps the visible rows in place when rows are inserted/removed above them.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+
+    def setModel(self, model):
+        super().setModel(model)
+        # Connected after the view's own handlers, so ours run last
+        model.rowsInserted.connect(lambda _parent, start, end: self._keep_scroll_anchor(start, end - start + 1))
+        model.rowsRemoved.connect(lambda _parent, start, end: self._keep_scroll_anchor(start, -(end - start + 1)))
+
+    def _keep_scroll_anchor(self, start, delta_rows):
+        bar = self.verticalScrollBar()
+        value = bar.value()
+        if value == 0:
+            # At the top: let the newest entry come into view
+            return
+
+        if self.verticalScrollMode() == self.ScrollPerItem:
+            first_visible, step = value, delta_rows
+        else:
+            row_height = self.verticalHeader().defaultSectionSize()
+            first_visible, step = value // row_height, delta_rows * row_height
+
+        if start > first_visible:
+            return
+
+        self.updateGeometries()
+        bar.setValue(value + step)
+
+    def mouseMoveEvent(self, event):
+        index = self.indexAt(event.pos())
+        if index.isValid() and index.column() == DELETE_COLUMN:
+            self.viewport().setCursor(Qt.PointingHandCursor)
+        else:
+            self.viewport().unsetCursor()
+        super().mouseMoveEvent(event)
@@ -0,0 +1,72 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+
+class LazyGraph(QWidget):
+    """
+    Stand-in for an MplGraph that only imports matplotlib and builds the
+    canvas when load() is called (after the window's first paint).
+
+    plot_*() calls made before that are remembered, and the latest one is
+    replayed on the real canvas (after the legend setting).
+    """
+    def __init__(self, parent=None, **graph_kwargs):
+        super().__init__(parent)
+        self.canvas = None
+        self._graph_kwargs = graph_kwargs
+        self._pending_plot = None
+        self._legend_visible = True
+
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+        self._placeholder = QLabel("Loading graph…")
+        self._placeholder.setObjectName("panelTitle")
+        self._placeholder.setAlignment(Qt.AlignCenter)
+        self._layout.addWidget(self._placeholder)
+
+    def is_loaded(self):
+        return self.canvas is not None
+
+    def load(self):
+        if self.canvas is not None:
+            return self.canvas
+
+        # The matplotlib + Qt5Agg import is the expensive part of startup
+        from ui.widgets.mpl_graph import MplGraph
+
+        self.canvas = MplGraph(self, **self._graph_kwargs)
+        self._layout.removeWidget(self._placeholder)
+        self._placeholder.deleteLater()
+        self._placeholder = None
+        self._layout.addWidget(self.canvas)
+
+        self.canvas.set_legend_visible(self._legend_visible)
+        if self._pending_plot is not None:
+            method, args = self._pending_plot
+            getattr(self.canvas, method)(*args)
+            self._pending_plot = None
+        return self.canvas
+
+    def plot_timeseries(self, x, y, title: str, ylabel: str):
+        if self.canvas is None:
+            self._pending_plot = ("plot_timeseries", (x, y, title, ylabel))
+            return
+        self.canvas.plot_timeseries(x, y, title, ylabel)
+
+    def plot_buckets(self, starts, values, width: float, title: str, ylabel: str):
+        if self.canvas is None:
+            self._pending_plot = ("plot_buckets", (starts, values, width, title, ylabel))
+            return
+        self.canvas.plot_buckets(starts, values, width, title, ylabel)
+
+    def plot_overlay(self, series, title: str, ylabel: str):
+        if self.canvas is None:
+            self._pending_plot = ("plot_overlay", (series, title, ylabel))
+            return
+        self.canvas.plot_overlay(series, title, ylabel)
+
+    def set_legend_visible(self, visible: bool):
+        self._legend_visible = visible
+        if self.canvas is not None:
+            self.canvas.set_legend_visible(visible)
@@ -1,10 +1,94 @@
+from matplotlib import colormaps
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.collections import LineCollection, PolyCollection
 from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 import matplotlib.dates as mdates
+import numpy as np
+from datetime import datetime
+
+HOVER_RADIUS_PT = 8  # how close (in points) the mouse must be to a dot
+
+# plot_overlay() colours, by series position: enough distinct ones for every aspect
+OVERLAY_COLORS = list(colormaps["tab20"].colors) + list(colormaps["Set2"].colors)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: pick `n_out` indices of (x, y) that keep
+    the visual shape of the series. First and last points are always kept.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (by - y[a]) - (x[a] - bx) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        out[i + 1] = a
+
+    return out
+
+
+def minmax_indices(x, y, n_bins):
+    """
+    Indices of the lowest and highest point in each of `n_bins` equal-width
+    x bins, plus the first and last point, in order. Coarser than LTTB but
+    loop-free, which matters when many series are downsampled per redraw.
+    """
+    n = len(x)
+    if n <= 2 * n_bins:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    span = x[-1] - x[0]
+    if span <= 0:
+        return np.array([0, n - 1])
+
+    bins = np.minimum(((x - x[0]) / span * n_bins).astype(int), n_bins - 1)
+    # x is sorted, so bins are contiguous; sort by y within each bin
+    order = np.lexsort((np.asarray(y), bins))
+    heads = np.flatnonzero(np.concatenate(([True], bins[1:] != bins[:-1])))
+    tails = np.append(heads[1:], n) - 1
+    return np.unique(np.concatenate(([0, n - 1], order[heads], order[tails])))
 
 
 class MplGraph(FigureCanvas):
-    def __init__(self, parent=None):
+    """
+    Retained-mode time series canvas: the axes styling, line, tooltip and
+    "No data yet" label are created once, and plot_timeseries() only swaps
+    the line data and rescales.
+
+    The tooltip is animated: it is left out of normal draws and blitted over
+    a cached background, and the hovered point is found with a binary search
+    on the (time-sorted) display x coordinates.
+
+    Series longer than the axes are wide (in pixels) are drawn downsampled
+    with LTTB when `downsample` is on; hover still reports full-resolution
+    values and deltas.
+
+    plot_buckets() shows rollups (one value per day/week) as bars instead,
+    drawn by a single PolyCollection. plot_overlay() draws many series at
+    once (every aspect) as a single LineCollection, one colour per series.
+    """
+    def __init__(self, parent=None, downsample=True):
+        self.downsample = downsample
+
         self.fig = Figure()
         self.ax = self.fig.add_subplot(111)
         super().__init__(self.fig)
@@ -18,11 +102,67 @@ class MplGraph(FigureCanvas):
             spine.set_color("#2a2f3a")
         self.ax.grid(True, alpha=0.25)
 
-        # Hover/tooltip state
-        self._line = None
-        self._x = []
-        self._y = []
-        self._delta = []
+        # Date axis (x values are matplotlib date numbers)
+        self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d"))
+        self.ax.xaxis.set_major_locator(mdates.AutoDateLocator(minticks=3, maxticks=6))
+        # Make dates readable
+        self.fig.autofmt_xdate(rotation=0)
+
+        self._title = self.ax.set_title("", color="#e6e9ef", fontsize=13, fontweight="600")
+        self.ax.set_ylabel("", color="#e6e9ef")
+
+        # Hover/tooltip state (full resolution)
+        self._xn = np.empty(0)
+        self._yn = np.empty(0)
+
+        # Indices into the full series that the line actually draws
+        self._shown = np.empty(0, dtype=int)
+        self._lod_points = 0
+
+        # Bucket width in days while plot_buckets() data is shown, else None
+        self._bucket_days = None
+
+        # While plot_overlay() data is shown: series number of every point in
+        # _xn/_yn (series are stored back to back), where each series starts
+        # (plus the end) and the series names
+        self._series_ids = None
+        self._series_starts = np.zeros(1, dtype=int)
+        self._series_names = []
+        self._legend_handles = []
+        self._legend_visible = True
+
+        # Display-space copies of the points + clean background, both
+        # refreshed on every full draw
+        self._px = np.empty(0)
+        self._py = np.empty(0)
+        self._background = None
+        self._hover_idx = None
+
+        # The one line this graph draws; data is swapped with set_data().
+        # - markersize affects dot size
+        (self._line,) = self.ax.plot(
+            [], [],
+            marker="o",
+            linewidth=2,
+            markersize=5,
+        )
+
+        # Bars for plot_buckets(); vertices are swapped with set_verts()
+        self._bars = PolyCollection([], facecolors="#2b6de8", edgecolors="#151922", linewidths=0.5)
+        self.ax.add_collection(self._bars)
+
+        # Lines for plot_overlay(); segments/colours are swapped in place
+        self._overlay = LineCollection([], linewidths=1.8)
+        self.ax.add_collection(self._overlay)
+
+        self._empty_text = self.ax.text(
+            0.5, 0.5, "No data yet",
+            ha="center", va="center",
+            transform=self.ax.transAxes,
+            color="#9aa6b2",
+            fontsize=12,
+            fontweight="600",
+        )
 
         # Tooltip annotation (hidden until hover)
         self._tooltip = self.ax.annotate(
@@ -34,103 +174,277 @@ class MplGraph(FigureCanvas):
             color="#e6e9ef",
             fontsize=10,
             visible=False,
+            animated=True,  # only ever drawn by _blit_tooltip()
         )
 
         # Mouse hover hook
         self.mpl_connect("motion_notify_event", self._on_hover)
+        self.mpl_connect("draw_event", self._on_draw)
 
     def plot_timeseries(self, x, y, title: str, ylabel: str):
-        self.ax.clear()
+        self._reset(title, ylabel)
 
-        # Re-apply dark styling after clear()
-        self.ax.set_facecolor("#151922")
-        self.ax.tick_params(colors="#cfd6e4")
-        for spine in self.ax.spines.values():
-            spine.set_color("#2a2f3a")
-        self.ax.grid(True, alpha=0.25)
+        if len(x) == 0 or len(y) == 0:
+            # Clear hover state
+            self._xn = np.empty(0)
+            self._yn = np.empty(0)
+            self._shown = np.empty(0, dtype=int)
+            self._line.set_data([], [])
+            self._empty_text.set_visible(True)
+            self.ax.set_xlim(0, 1)
+            self.ax.set_ylim(0, 1)
+            self.draw_idle()
+            return
 
-        # Recreate tooltip after clear() (annotation lives on the Axes)
-        self._tooltip = self.ax.annotate(
-            "",
-            xy=(0, 0),
-            xytext=(12, 12),
-            textcoords="offset points",
-            bbox=dict(boxstyle="round,pad=0.35", fc="#0f131a", ec="#2a2f3a"),
-            color="#e6e9ef",
-            fontsize=10,
-            visible=False,
-        )
+        # Store data for tooltip. x may be datetimes or (preferably, since
+        # it needs no conversion) matplotlib date numbers.
+        if isinstance(x[0], datetime):
+            self._xn = np.asarray(mdates.date2num(x), dtype=float)
+        else:
+            self._xn = np.asarray(x, dtype=float)
+        self._yn = np.asarray(y)
 
-        self.ax.set_title(title, color="#e6e9ef", fontsize=13, fontweight="600")
-        self.ax.set_ylabel(ylabel, color="#e6e9ef")
+        self._apply_level_of_detail()
+        self._empty_text.set_visible(False)
 
-        self.ax.xaxis.set_major_formatter(mdates.DateFormatter("%b %d"))
-        self.ax.xaxis.set_major_locator(mdates.AutoDateLocator(minticks=3, maxticks=6))
+        # set_xlim/set_ylim in the empty state switch autoscaling off
+        self.ax.set_autoscale_on(True)
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.draw_idle()
+
+    def plot_buckets(self, starts, values, width: float, title: str, ylabel: str):
+        """
+        One bar per bucket: [start, start + width) days, height `value`.
+        Hover reports the bucket and its value.
+        """
+        self._reset(title, ylabel)
+
+        if len(starts) == 0:
+            self.plot_timeseries([], [], title, ylabel)
+            return
+
+        self._bucket_days = width
+        left = np.asarray(starts, dtype=float)
+        right = left + width * 0.9
+        heights = np.asarray(values)
+        zeros = np.zeros_like(left)
+        # (n, 4, 2): bottom-left, top-left, top-right, bottom-right
+        self._bars.set_verts(np.stack([
+            np.column_stack([left, zeros]),
+            np.column_stack([left, heights]),
+            np.column_stack([right, heights]),
+            np.column_stack([right, zeros]),
+        ], axis=1))
+
+        # Hover targets are the bar tops
+        self._xn = left + width * 0.45
+        self._yn = heights
+        self._shown = np.arange(len(left))
+        self._empty_text.set_visible(False)
+
+        # relim() doesn't see collections, so set the limits here
+        top = max(float(heights.max()), 1.0)
+        self.ax.set_xlim(left[0] - width * 0.5, right[-1] + width * 0.5)
+        self.ax.set_ylim(min(0.0, float(heights.min())), top * 1.05)
+        self.draw_idle()
+
+    def plot_overlay(self, series, title: str, ylabel: str):
+        """
+        Several series at once: `series` is [(name, x, y), ...] and colours
+        follow list position, so pass a fixed list (empty series are fine).
+        Each series is downsampled on its own, again on every resize
+        (minmax_indices(), as LTTB per series would cost a Python loop each);
+        hover covers all of them.
+        """
+        self._reset(title, ylabel)
+
+        colors, xs, ys, ids = [], [], [], []
+        for position, (name, x, y) in enumerate(series):
+            if len(x) == 0:
+                continue
+            color = OVERLAY_COLORS[position % len(OVERLAY_COLORS)]
+            colors.append(color)
+            self._legend_handles.append(Line2D([], [], color=color, linewidth=2, label=name))
+            ids.append(np.full(len(x), len(self._series_names)))
+            self._series_names.append(name)
+            xs.append(np.asarray(x, dtype=float))
+            ys.append(np.asarray(y))
 
-        if not x or not y:
-            self.ax.text(
-                0.5, 0.5, "No data yet",
-                ha="center", va="center",
-                transform=self.ax.transAxes,
-                color="#9aa6b2",
-                fontsize=12,
-                fontweight="600"
+        if not xs:
+            self.plot_timeseries([], [], title, ylabel)
+            return
+
+        self._xn = np.concatenate(xs)
+        self._yn = np.concatenate(ys)
+        self._series_ids = np.concatenate(ids)
+        self._series_starts = np.cumsum([0] + [len(x) for x in xs])
+        self._overlay.set_color(colors)
+        self._apply_overlay_level_of_detail()
+        self._empty_text.set_visible(False)
+        self._update_legend()
+
+        # relim() doesn't see collections, so set the limits here
+        x0, x1 = float(self._xn.min()), float(self._xn.max())
+        y0, y1 = float(self._yn.min()), float(self._yn.max())
+        pad_x = (x1 - x0) * 0.03 or 0.5
+        pad_y = (y1 - y0) * 0.05 or 1.0
+        self.ax.set_xlim(x0 - pad_x, x1 + pad_x)
+        self.ax.set_ylim(y0 - pad_y, y1 + pad_y)
+        self.draw_idle()
+
+    def set_legend_visible(self, visible: bool):
+        self._legend_visible = visible
+        self._update_legend()
+        self.draw_idle()
+
+    def _update_legend(self):
+        legend = self.ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        if self._legend_visible and self._legend_handles:
+            self.ax.legend(
+                handles=self._legend_handles, loc="upper left", ncol=2, fontsize=8,
+                facecolor="#0f131a", edgecolor="#2a2f3a", labelcolor="#e6e9ef", framealpha=0.85,
             )
-            # Clear hover state
-            self._line = None
-            self._x = []
-            self._y = []
-            self._delta = []
-            self.draw()
+
+    def _reset(self, title, ylabel):
+        # set_text, not set_title(): set_title() resets the font styling
+        self._title.set_text(title)
+        self.ax.set_ylabel(ylabel)
+        self._tooltip.set_visible(False)
+        self._hover_idx = None
+        # Display coordinates are stale until the next draw
+        self._px = self._py = np.empty(0)
+
+        # Each plot_* call shows exactly one kind of artist
+        self._line.set_data([], [])
+        self._bucket_days = None
+        self._bars.set_verts([])
+        self._series_ids = None
+        self._series_names = []
+        self._legend_handles = []
+        self._overlay.set_segments([])
+        self._update_legend()
+
+    def _on_draw(self, _event):
+        # Tooltip is animated, so this snapshot never contains it
+        self._background = self.copy_from_bbox(self.fig.bbox)
+
+        if len(self._shown):
+            points = self.ax.transData.transform(
+                np.column_stack([self._xn[self._shown], self._yn[self._shown]])
+            )
+            self._px, self._py = points[:, 0], points[:, 1]
+        else:
+            self._px = self._py = np.empty(0)
+
+        if self._hover_idx is not None:
+            self._hover_idx = None
+            self._tooltip.set_visible(False)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        # A wider/narrower axes changes how many points are worth drawing
+        if self._bucket_days is not None or not self.downsample:
             return
+        if self._series_ids is not None:
+            if np.diff(self._series_starts).max() > min(self._lod_points, self._lod_target()):
+                self._apply_overlay_level_of_detail()
+                self.draw_idle()
+        elif len(self._xn) > min(self._lod_points, self._lod_target()):
+            self._apply_level_of_detail()
+            self.draw_idle()
 
-        # Store data for tooltip (ensure list-like)
-        self._x = list(x)
-        self._y = list(y)
-        self._delta = [None] + [self._y[i] - self._y[i - 1] for i in range(1, len(self._y))]
+    def _lod_target(self):
+        return max(3, int(self.ax.bbox.width))
 
-        # Plot with a "near dot" hover radius:
-        # - picker (in points) controls how close the mouse must be
-        # - markersize affects dot size
-        (self._line,) = self.ax.plot(
-            self._x, self._y,
-            marker="o",
-            linewidth=2,
-            markersize=5,
-            picker=8,  # hover distance in points
-        )
+    def _apply_level_of_detail(self):
+        n = len(self._xn)
+        self._lod_points = self._lod_target()
 
-        # Make dates readable
-        self.fig.autofmt_xdate(rotation=0)
+        if self.downsample and n > self._lod_points:
+            self._shown = lttb_indices(self._xn, self._yn, self._lod_points)
+            # Per-point markers are an unreadable blob at this density
+            self._line.set_marker("")
+        else:
+            self._shown = np.arange(n)
+            self._line.set_marker("o")
 
-        self.draw()
+        self._line.set_data(self._xn[self._shown], self._yn[self._shown])
+        self._hover_idx = None
+        self._px = self._py = np.empty(0)
+
+    def _apply_overlay_level_of_detail(self):
+        # Per series, like _apply_level_of_detail(), but with minmax_indices()
+        self._lod_points = self._lod_target()
+
+        segments, shown = [], []
+        starts = self._series_starts
+        for lo, hi in zip(starts[:-1], starts[1:]):
+            x, y = self._xn[lo:hi], self._yn[lo:hi]
+            keep = minmax_indices(x, y, self._lod_points // 2) if self.downsample else np.arange(hi - lo)
+            segments.append(np.column_stack([x[keep], y[keep]]))
+            shown.append(keep + lo)
+        self._overlay.set_segments(segments)
+
+        # Hover needs the drawn points in x order across all series
+        shown = np.concatenate(shown)
+        self._shown = shown[np.argsort(self._xn[shown], kind="stable")]
+        self._hover_idx = None
+        self._px = self._py = np.empty(0)
+
+    def _nearest_index(self, x, y):
+        """
+        Index (into the full series) of the closest drawn point within the
+        hover radius, or None. Only points whose x falls inside the radius
+        are measured.
+        """
+        radius = HOVER_RADIUS_PT * self.fig.dpi / 72
+        lo = int(np.searchsorted(self._px, x - radius, side="left"))
+        hi = int(np.searchsorted(self._px, x + radius, side="right"))
+        if lo >= hi:
+            return None
+
+        dist2 = (self._px[lo:hi] - x) ** 2 + (self._py[lo:hi] - y) ** 2
+        i = int(np.argmin(dist2))
+        if dist2[i] > radius * radius:
+            return None
+        return int(self._shown[lo + i])
 
     def _on_hover(self, event):
-        # Only respond when we're over this axes and have a plotted line
-        if self._line is None or event.inaxes != self.ax:
-            if self._tooltip.get_visible():
-                self._tooltip.set_visible(False)
-                self.draw_idle()
+        idx = None
+        # Only respond when we're over this axes and have plotted data
+        if len(self._px) and event.inaxes == self.ax:
+            idx = self._nearest_index(event.x, event.y)
+
+        if idx == self._hover_idx:
             return
+        self._hover_idx = idx
 
-        contains, info = self._line.contains(event)
-        if not contains or "ind" not in info or not info["ind"]:
-            if self._tooltip.get_visible():
-                self._tooltip.set_visible(False)
-                self.draw_idle()
+        if idx is None:
+            self._tooltip.set_visible(False)
+            self._blit_tooltip()
             return
 
-        idx = info["ind"][0]
+        y_val = int(self._yn[idx])
+        d_val = None if idx == 0 else int(self._yn[idx] - self._yn[idx - 1])
+
+        date_str = mdates.num2date(self._xn[idx]).strftime("%b %d, %Y")
 
-        x_val = self._x[idx]
-        y_val = self._y[idx]
-        d_val = self._delta[idx]
+        if self._series_ids is not None:
+            name = self._series_names[self._series_ids[idx]]
+            # Series are stored back to back: the previous point is the same
+            # series' previous point unless this one starts a series
+            if idx > 0 and self._series_ids[idx - 1] != self._series_ids[idx]:
+                d_val = None
+            date_str = f"{name}\n{date_str}"
 
-        # Format date nicely if x is datetime-like
-        try:
-            date_str = x_val.strftime("%b %d, %Y")
-        except Exception:
-            date_str = str(x_val)
+        if self._bucket_days is not None:
+            if self._bucket_days > 1:
+                date_str = "Week of " + mdates.num2date(self._xn[idx] - self._bucket_days * 0.45).strftime("%b %d, %Y")
+            self._show_tooltip(idx, f"{date_str}\n{self.ax.get_ylabel()}: {y_val:,}")
+            return
 
         if d_val is None:
             delta_str = "Δ XP: —"
@@ -138,9 +452,18 @@ class MplGraph(FigureCanvas):
             sign = "+" if d_val >= 0 else ""
             delta_str = f"Δ XP: {sign}{d_val:,}"
 
-        text = f"{date_str}\nXP: {y_val:,}\n{delta_str}"
+        self._show_tooltip(idx, f"{date_str}\nXP: {y_val:,}\n{delta_str}")
 
-        self._tooltip.xy = (x_val, y_val)
+    def _show_tooltip(self, idx, text):
+        self._tooltip.xy = (self._xn[idx], self._yn[idx])
         self._tooltip.set_text(text)
         self._tooltip.set_visible(True)
-        self.draw_idle()
+        self._blit_tooltip()
+
+    def _blit_tooltip(self):
+        if self._background is None:
+            return
+        self.restore_region(self._background)
+        if self._tooltip.get_visible():
+            self.ax.draw_artist(self._tooltip)
+        self.blit(self.fig.bbox)
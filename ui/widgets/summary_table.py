@@ -0,0 +1,44 @@
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+HEADERS = ["Series", "Level", "XP", "XP/h (7d)", "Last session", "ETA"]
+
+
+class SummaryTableModel(QAbstractTableModel):
+    """
+    Read-only model over the per-series summary rows (one per aspect at its
+    current level, plus the mastery chain). Rows are tuples of display
+    strings, formatted by the controller.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def set_rows(self, rows):
+        rows = [tuple(row) for row in rows]
+        if rows == self._rows:
+            return  # nothing moved: don't reset the view (keeps scroll/selection)
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    # ---- QAbstractTableModel ----
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[index.row()][index.column()]
+        if role == Qt.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
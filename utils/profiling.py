@@ -0,0 +1,236 @@
+"""
+Opt-in hot-path instrumentation.
+
+Enabled with UOXP_PROFILE=1 (or UOXP_PROFILE=<log path>) or `app.py --profile
+[PATH]`. Profiler.install() wraps the storage, controller and graph methods
+listed below at class level, so with profiling off nothing is wrapped and
+there is no overhead at all. The report is written to the log file on exit.
+"""
+import bisect
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+ENV_VAR = "UOXP_PROFILE"
+DEFAULT_LOG = Path("data") / "profile.log"
+
+STORAGE_METHODS = (
+    "load_history", "load_frame", "history_index", "append_record", "append_records", "save_history", "delete_record",
+    "compact", "compact_if_needed", "aspect_series", "chain_series", "is_stale", "flush",
+    "aspect_series_by_level", "chain_series_by_level", "aspect_rollup", "chain_rollup",
+)
+CONTROLLER_METHODS = (
+    "refresh_history", "refresh_graphs", "refresh_progress_bars", "validate_all", "_set_valid",
+    "load_history_snapshot", "on_history_loaded", "fill_history_chunk",
+    "build_graph_series", "on_graph_series_ready", "refresh_summary", "refresh_lifetime_progress",
+)
+# User actions: calls are attributed to the most recent one
+CONTROLLER_ACTIONS = (
+    "on_aspect_changed", "on_aspect_level_changed", "on_chain_level_changed",
+    "on_aspect_xp_edited", "on_chain_xp_edited", "on_save_clicked", "on_export_clicked",
+    "on_history_delete_requested", "on_history_file_changed", "on_compact_idle",
+    "on_profile_changed", "on_new_profile_clicked", "on_view_mode_changed", "on_legend_toggled",
+)
+GRAPH_METHODS = ("plot_timeseries", "plot_buckets", "plot_overlay", "draw", "_blit_tooltip")
+
+# Histogram bucket upper bounds, in ms
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+def profiler_from_args(argv: List[str]) -> Optional["Profiler"]:
+    """
+    Profiler if `--profile [PATH]` is in argv (removed from it) or the
+    environment variable is set; otherwise None.
+    """
+    path = None
+    if "--profile" in argv:
+        i = argv.index("--profile")
+        del argv[i]
+        path = DEFAULT_LOG
+        if i < len(argv) and not argv[i].startswith("-"):
+            path = Path(argv.pop(i))
+    else:
+        value = os.environ.get(ENV_VAR, "").strip()
+        if value and value.lower() not in ("0", "false", "no", "off"):
+            path = DEFAULT_LOG if value.lower() in ("1", "true", "yes", "on") else Path(value)
+
+    return Profiler(path) if path is not None else None
+
+
+class Profiler:
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self.first_paint_ms: Optional[float] = None
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._timings = defaultdict(list)             # name -> [seconds]
+        self._action = "startup"
+        self._actions = Counter({"startup": 1})       # action -> times triggered
+        self._calls = defaultdict(Counter)            # action -> name -> calls
+        self._installed = False
+        self._graph_instrumented = False
+
+    # -------------------------
+    # Wiring
+    # -------------------------
+
+    def install(self) -> None:
+        """
+        Instrument the app's classes. Call before the window/controller are
+        created (signal connections capture the methods at that point).
+        """
+        if self._installed:
+            return
+        self._installed = True
+
+        from controllers.main_controller import MainController
+        from services.sqlite_storage import SqliteStorageService
+        from services.storage_service import StorageService
+        from ui.main_window import MainWindow
+        from ui.widgets.lazy_graph import LazyGraph
+
+        self.instrument(StorageService, STORAGE_METHODS, "storage")
+        self.instrument(SqliteStorageService, STORAGE_METHODS, "storage")
+        self.instrument(MainController, CONTROLLER_METHODS, "controller")
+        self.instrument(MainController, CONTROLLER_ACTIONS, "action", action=True)
+
+        # matplotlib stays lazy: instrument MplGraph just before it is imported,
+        # i.e. in LazyGraph.load() or, without fast_start, in _make_graph()
+        self._before(LazyGraph, "load", lambda graph: self._instrument_graph())
+        self._before(MainWindow, "_make_graph", self._instrument_eager_graph)
+
+    def instrument(self, cls, names: Iterable[str], prefix: str, action=False) -> None:
+        for name in names:
+            original = cls.__dict__.get(name)
+            if original is not None:
+                setattr(cls, name, self._wrap(f"{prefix}.{name}", original, action))
+
+    def _instrument_graph(self) -> None:
+        if self._graph_instrumented:
+            return
+        self._graph_instrumented = True
+
+        from ui.widgets.mpl_graph import MplGraph
+        # draw() is inherited from the canvas; the wrapper goes on MplGraph
+        for name in GRAPH_METHODS:
+            setattr(MplGraph, name, self._wrap(f"graph.{name}", getattr(MplGraph, name)))
+
+    def _instrument_eager_graph(self, window, parent) -> None:
+        if not window.fast_start:
+            self._instrument_graph()
+
+    def _before(self, cls, name: str, hook: Callable[..., None]) -> None:
+        # hook is called with the method's arguments (self included)
+        original = cls.__dict__[name]
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            hook(*args, **kwargs)
+            return original(*args, **kwargs)
+
+        setattr(cls, name, wrapper)
+
+    def _wrap(self, name: str, fn: Callable, action=False) -> Callable:
+        # Qt passes signal arguments the slot doesn't declare (e.g. clicked's
+        # `checked`); drop them like a plain slot would
+        params = inspect.signature(fn).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in params):
+            max_args = None
+        else:
+            max_args = sum(p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            if action:
+                self._start_action(name)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter() - start)
+
+        return wrapper
+
+    # -------------------------
+    # Recording
+    # -------------------------
+
+    def _start_action(self, name: str) -> None:
+        with self._lock:
+            self._action = name
+            self._actions[name] += 1
+
+    def _record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._timings[name].append(seconds)
+            self._calls[self._action][name] += 1
+
+    def set_first_paint(self, ms: float) -> None:
+        self.first_paint_ms = ms
+
+    # -------------------------
+    # Report
+    # -------------------------
+
+    def report(self) -> str:
+        with self._lock:
+            timings = {name: sorted(values) for name, values in self._timings.items()}
+            actions = Counter(self._actions)
+            calls = {action: Counter(c) for action, c in self._calls.items()}
+
+        lines = [
+            f"== UOXP profile, {datetime.now().isoformat(timespec='seconds')} "
+            f"({time.perf_counter() - self._started:.1f} s session) ==",
+        ]
+        if self.first_paint_ms is not None:
+            lines.append(f"time to first paint: {self.first_paint_ms:.0f} ms")
+
+        lines.append("")
+        lines.append(f"{'call':<40}{'calls':>7}{'total ms':>11}{'mean ms':>10}{'p50':>9}{'p95':>9}{'max':>9}")
+        by_total = sorted(timings.items(), key=lambda item: -sum(item[1]))
+        for name, values in by_total:
+            ms = [v * 1000 for v in values]
+            lines.append(
+                f"{name:<40}{len(ms):>7}{sum(ms):>11.1f}{sum(ms) / len(ms):>10.2f}"
+                f"{_percentile(ms, 50):>9.2f}{_percentile(ms, 95):>9.2f}{ms[-1]:>9.2f}"
+            )
+            lines.append(f"    {_histogram(ms)}")
+
+        lines.append("")
+        lines.append("calls per user action (average per occurrence):")
+        for action, count in actions.most_common():
+            per = calls.get(action)
+            if not per:
+                continue
+            detail = ", ".join(f"{name} {n / count:g}" for name, n in per.most_common())
+            lines.append(f"  {action} x{count}: {detail}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_report(self) -> Path:
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(self.report() + "\n")
+        return self.log_path
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    i = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[i]
+
+
+def _histogram(sorted_ms: List[float]) -> str:
+    counts = Counter(bisect.bisect_left(BUCKETS_MS, v) for v in sorted_ms)
+    parts = []
+    for i in sorted(counts):
+        label = f"<={BUCKETS_MS[i]:g}ms" if i < len(BUCKETS_MS) else f">{BUCKETS_MS[-1]:g}ms"
+        parts.append(f"{label}:{counts[i]}")
+    return " ".join(parts)
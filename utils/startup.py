@@ -0,0 +1,11 @@
+import time
+
+# Imported first thing by app.py, so this is (close to) process start
+STARTED_AT = time.perf_counter()
+
+
+def elapsed_ms() -> float:
+    """
+    Milliseconds since STARTED_AT.
+    """
+    return (time.perf_counter() - STARTED_AT) * 1000
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+# Records store local wall-clock ISO strings without a timezone. They are
+# converted as if they were UTC so the numbers line up with matplotlib's date
+# numbers (days since 1970-01-01) and show the same wall-clock time.
+_EPOCH = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+SECONDS_PER_DAY = 86400.0
+US_PER_DAY = 86_400_000_000
+
+
+def timestamp_to_us(ts: str) -> Optional[int]:
+    """
+    ISO timestamp -> microseconds since 1970-01-01 (same wall-clock rule).
+    None if it can't be parsed.
+    """
+    try:
+        dt = datetime.fromisoformat(ts)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH) // _ONE_US
+
+
+def us_to_timestamp(us: int) -> str:
+    """
+    Inverse of timestamp_to_us(): the ISO string the app writes.
+    """
+    return (_EPOCH + timedelta(microseconds=us)).isoformat()
+
+
+def round_trips(ts: str) -> bool:
+    """
+    True if `ts` is exactly what us_to_timestamp() gives back for it, i.e.
+    the "YYYY-MM-DDTHH:MM:SS" shape on_save_clicked() writes. A cheap shape
+    check (it may say False for some other round-tripping strings).
+    """
+    return (
+        len(ts) == 19 and ts.isascii()
+        and ts[4] == ts[7] == "-" and ts[10] == "T" and ts[13] == ts[16] == ":"
+    )
+
+
+def timestamp_to_days(ts: str) -> Optional[float]:
+    """
+    ISO timestamp -> days since 1970-01-01 (a matplotlib date number).
+    None if it can't be parsed.
+    """
+    us = timestamp_to_us(ts)
+    # int / int is correctly rounded, so this matches us / US_PER_DAY in numpy
+    return None if us is None else us / US_PER_DAY
+
+
+def days_to_datetime(days: float) -> datetime:
+    """
+    Inverse of timestamp_to_days() (naive wall-clock datetime).
+    """
+    return _EPOCH + timedelta(days=float(days))
+
+
+def display_date(ts: str) -> str:
+    """
+    "2026-01-10T21:08:43" -> "January 10, 2026", memoized per calendar day.
+    """
+    if not isinstance(ts, str):
+        return ""
+    return _display_day(ts[:10]) or ts
+
+
+@lru_cache(maxsize=4096)
+def _display_day(day: str) -> Optional[str]:
+    try:
+        return datetime.fromisoformat(day).strftime("%B %d, %Y")
+    except ValueError:
+        return None